@@ -0,0 +1,137 @@
+import heapq
+
+from subnet import SubnetV4, SubnetV4Array, _freeBlocks
+from subnetter import ImpossibleSubnetError, SubnetterV4
+
+class SubnetAllocatorV4():
+    '''an incremental subnet allocator tracking the free address space of a root network as buddy blocks,
+    around any subnets of the root that are already in use'''
+
+    def __init__(self, root: SubnetV4, used: [SubnetV4] = ()):
+        if not isinstance(root, SubnetV4):
+            raise TypeError('\'root\' must be a SubnetV4, not a ' + str(type(root)))
+        self.root = root
+        # free block network addresses for every slash notation mask, with a lazily cleaned heap of the same
+        # addresses so the lowest free block of a size can always be found quickly
+        self.free_blocks = [set() for mask in range(SubnetV4.MAX_BITS + 1)]
+        self.free_heaps = [[] for mask in range(SubnetV4.MAX_BITS + 1)]
+        self.allocated = {}
+        self.used = 0
+        if not used:
+            self._addFree(root.networkAddr(), root.slashMask())
+            return
+        base = root.networkAddr()
+        total = root.totalAddr()
+        ranges = []
+        for subnet in used:
+            if not isinstance(subnet, SubnetV4):
+                raise TypeError('every element in \'used\' must be a SubnetV4, not a ' + str(type(subnet)))
+            start = subnet.net_addr - base
+            end = start + SubnetV4.SIZES[subnet.mask]
+            if start < 0 or end > total:
+                raise ValueError(str(subnet) + ' is not inside ' + str(root))
+            ranges.append((start, end))
+        # the free space is split into the largest blocks aligned relative to the root, like the blocks of a plan,
+        # so none of them has a free buddy and they are the fewest blocks covering it
+        self.used = total
+        for addr, mask in _freeBlocks(0, total, ranges, SubnetV4.MAX_BITS):
+            self._addFree(base + addr, mask)
+            self.used -= SubnetV4.SIZES[mask]
+        return
+
+    def __repr__(self) -> str:
+        return 'SubnetAllocatorV4(' + repr(self.root) + ')'
+
+    def _addFree(self, addr: int, mask: int):
+        '''mark a block as free'''
+        blocks = self.free_blocks[mask]
+        heap = self.free_heaps[mask]
+        blocks.add(addr)
+        heapq.heappush(heap, addr)
+        if len(heap) > 2 * len(blocks) + 16:
+            heap[:] = blocks
+            heapq.heapify(heap)
+
+    def _popFree(self, mask: int) -> int:
+        '''take the lowest free block with a mask'''
+        blocks = self.free_blocks[mask]
+        heap = self.free_heaps[mask]
+        while True:
+            addr = heapq.heappop(heap)
+            if addr in blocks:
+                blocks.remove(addr)
+                return addr
+
+    def allocate(self, hosts: int) -> SubnetV4:
+        '''allocate the lowest of the smallest free blocks that fits a number of hosts'''
+        if not isinstance(hosts, int):
+            raise TypeError('\'hosts\' must be an integer, not a ' + str(type(hosts)))
+        if hosts < 1:
+            raise ValueError('\'hosts\' must be greater than 0, not ' + str(hosts))
+        mask = SubnetV4.MAX_BITS - SubnetterV4.requiredBits(hosts + 2)
+        block_mask = mask
+        while block_mask >= self.root.mask and not self.free_blocks[block_mask]:
+            block_mask -= 1
+        if block_mask < self.root.mask:
+            raise ImpossibleSubnetError(self.root, [hosts])
+        addr = self._popFree(block_mask)
+        while block_mask < mask:
+            block_mask += 1
+            self._addFree(addr + SubnetV4.SIZES[block_mask], block_mask)
+        self.allocated[addr] = mask
+        self.used += SubnetV4.SIZES[mask]
+        return SubnetV4._unchecked(addr, mask)
+
+    def allocateMany(self, hosts: [int]) -> [SubnetV4]:
+        '''allocate a subnet for every host quantity, largest first, releasing them all again if any does not fit;
+        as every block is a power of two in size, placing the largest first into the smallest free blocks
+        fits all of them whenever any placement can'''
+        if not isinstance(hosts, list):
+            raise TypeError('\'hosts\' must be a list, not a ' + str(type(hosts)))
+        subnets = []
+        try:
+            for host in sorted(hosts, reverse=True):
+                subnets.append(self.allocate(host))
+        except Exception as e:
+            for subnet in subnets:
+                self.free(subnet)
+            if isinstance(e, ImpossibleSubnetError):
+                raise ImpossibleSubnetError(self.root, hosts) from e
+            raise
+        return subnets
+
+    def free(self, subnet: SubnetV4):
+        '''release an allocated subnet, merging it with its free buddy blocks'''
+        if not isinstance(subnet, SubnetV4):
+            raise TypeError('\'subnet\' must be a SubnetV4, not a ' + str(type(subnet)))
+        if self.allocated.get(subnet.net_addr) != subnet.mask:
+            raise ValueError(str(subnet) + ' is not allocated from ' + str(self.root))
+        del self.allocated[subnet.net_addr]
+        self.used -= SubnetV4.SIZES[subnet.mask]
+        base = self.root.networkAddr()
+        addr = subnet.net_addr
+        mask = subnet.mask
+        while mask > self.root.mask:
+            buddy = base + ((addr - base) ^ SubnetV4.SIZES[mask])
+            if buddy not in self.free_blocks[mask]:
+                break
+            self.free_blocks[mask].remove(buddy)
+            addr = min(addr, buddy)
+            mask -= 1
+        self._addFree(addr, mask)
+
+    def calcSubnets(self) -> [SubnetV4]:
+        '''the currently allocated subnets in address order'''
+        return [SubnetV4._unchecked(addr, self.allocated[addr]) for addr in sorted(self.allocated)]
+
+    def calcFree(self) -> SubnetV4Array:
+        '''the free blocks of the root network in address order'''
+        res = SubnetV4Array()
+        for addr, mask in sorted((addr, mask) for mask, blocks in enumerate(self.free_blocks) for addr in blocks):
+            res.net_addrs.append(addr)
+            res.masks.append(mask)
+        return res
+
+    def calcRemaining(self) -> int:
+        '''the number of free network addresses in the root network'''
+        return self.root.totalAddr() - self.used
@@ -0,0 +1,283 @@
+'''timing comparisons for the subnet calculator
+run with: python benchmark.py [name ...]'''
+import io
+import random
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from array import array
+
+from allocator import SubnetAllocatorV4
+from subnet import ADDR_TYPECODE, SubnetV4, SubnetV4Array, SubnetV6
+from serializer import SERIALIZERS
+from subnetindex import SubnetIndexV4
+from subnetter import SubnetterV4, SubnetterV6
+
+def randomStrs(n: int, seed: int = 0) -> [str]:
+    '''generate random slash notation network address strings'''
+    rand = random.Random(seed)
+    return [str(SubnetV4(rand.getrandbits(SubnetV4.MAX_BITS), rand.randint(8, 30))) for i in range(n)]
+
+def report(name: str, n: int, seconds: float):
+    '''print the total and per item time taken'''
+    print('{:<40} {:>10} items {:>10.3f} s {:>10.3f} us/item'.format(name, n, seconds, seconds / n * 1e6))
+
+def benchParse(n: int = 1000000):
+    '''parse strings one at a time against all at once'''
+    strs = randomStrs(n)
+    report('strToSubnetV4 loop', n, timeit.timeit(lambda: [SubnetV4.strToSubnetV4(x) for x in strs], number=1))
+    report('parseMany', n, timeit.timeit(lambda: SubnetV4.parseMany(strs), number=1))
+
+def benchFormat(n: int = 1000000):
+    '''format subnets one at a time against all at once'''
+    net_addrs, masks, errors = SubnetV4.parseMany(randomStrs(n))
+    subnets = [SubnetV4(net_addr, mask) for net_addr, mask in zip(net_addrs, masks)]
+    report('str loop', n, timeit.timeit(lambda: [str(subnet) for subnet in subnets], number=1))
+    report('formatMany', n, timeit.timeit(lambda: SubnetV4.formatMany(net_addrs, masks), number=1))
+
+def benchCompact(n: int = 200000):
+    '''compare the memory used by a list of subnets against a SubnetV4Array'''
+    subnetter = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), [2] * n)
+    for compact in (False, True):
+        tracemalloc.start()
+        subnets = subnetter.calcSubnets(compact)
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print('{:<40} {:>10} items {:>10} B {:>10.1f} B/item'.format(type(subnets).__name__, n, size, size / n))
+
+def legacyIntToAddr(x: int) -> tuple:
+    '''the original power and floor division conversion of an integer into an address'''
+    base = 2 ** (SubnetV4.MAX_BITS // SubnetV4.ADDR_DIVISIONS)
+    i = SubnetV4.ADDR_DIVISIONS - 1
+    addr = []
+    while i >= 0:
+        num = x // (base ** i)
+        addr.append(num)
+        x -= num * base ** i
+        i -= 1
+    return tuple(addr)
+
+def legacyAddrToInt(x: tuple) -> int:
+    '''the original power and multiplication conversion of an address into an integer'''
+    x = list(x)
+    x.reverse()
+    base = 2 ** (SubnetV4.MAX_BITS // SubnetV4.ADDR_DIVISIONS)
+    addr = 0
+    for i in range(SubnetV4.ADDR_DIVISIONS):
+        addr += x[i] * base ** i
+    return addr
+
+def legacyAddrMask(subnet: SubnetV4) -> tuple:
+    '''the original string building calculation of an address mask'''
+    return legacyIntToAddr(int('0b' + '1' * subnet.mask + '0' * (SubnetV4.MAX_BITS - subnet.mask), 2))
+
+def legacyTotalAddr(subnet: SubnetV4) -> int:
+    '''the original power calculation of the number of addresses in a subnet'''
+    return 2 ** (SubnetV4.MAX_BITS - subnet.mask)
+
+def legacyRequiredBits(x: int) -> int:
+    '''the original linear search for the number of bits to store an unsigned integer'''
+    if x == 0:
+        return 0
+    bits = 1
+    while x > 2 ** bits:
+        bits += 1
+    return bits
+
+def reportCall(name: str, func, number: int):
+    '''print the best per call time of a function over several repeats'''
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print('{:<40} {:>10.3f} ns/call'.format(name, seconds * 1e9))
+
+def benchArithmetic(number: int = 200000):
+    '''compare the per call latency of the original and current address arithmetic'''
+    subnet = SubnetV4.strToSubnetV4('172.16.254.0/23')
+    addr = subnet.networkAddr()
+    parts = SubnetV4.intToAddr(addr)
+    for name, before, after in (
+            ('intToAddr', lambda: legacyIntToAddr(addr), lambda: SubnetV4.intToAddr(addr)),
+            ('addrToInt', lambda: legacyAddrToInt(parts), lambda: SubnetV4.addrToInt(parts)),
+            ('addrMask', lambda: legacyAddrMask(subnet), subnet.addrMask),
+            ('totalAddr', lambda: legacyTotalAddr(subnet), subnet.totalAddr),
+            ('requiredBits', lambda: legacyRequiredBits(100000), lambda: SubnetterV4.requiredBits(100000))):
+        reportCall(name + ' before', before, number)
+        reportCall(name + ' after', after, number)
+
+def legacyCalcSubnets(subnetter: SubnetterV4) -> [SubnetV4]:
+    '''the original subnet calculation validating every subnet it creates'''
+    hosts = subnetter.hosts.copy()
+    hosts.sort()
+    hosts.reverse()
+    addr = subnetter.root.networkAddr()
+    subnets = []
+    for host in hosts:
+        bit = legacyRequiredBits(host + 2)
+        subnet = SubnetV4(addr, SubnetV4.MAX_BITS - bit)
+        if subnet.broadcastAddr() > subnetter.root.broadcastAddr():
+            raise ValueError('impossible')
+        subnets.append(subnet)
+        addr += 2 ** bit
+    return subnets
+
+def benchPlan(n: int = 100000):
+    '''compare the original and current subnet calculation'''
+    rand = random.Random(0)
+    subnetter = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), [rand.randint(1, 100) for i in range(n)])
+    report('calcSubnets before', n, timeit.timeit(lambda: legacyCalcSubnets(subnetter), number=1))
+    SubnetterV4.CACHE.clear()
+    report('calcSubnets after', n, timeit.timeit(subnetter.calcSubnets, number=1))
+    SubnetterV4.CACHE.clear()
+    report('calcSubnets after (compact)', n, timeit.timeit(lambda: subnetter.calcSubnets(True), number=1))
+    report('calcSubnets after (compact, cached)', n, timeit.timeit(lambda: subnetter.calcSubnets(True), number=1))
+    SubnetterV4.CACHE.clear()
+    report('calcSubnets and calcRemaining', n,
+           timeit.timeit(lambda: (subnetter.calcSubnets(), subnetter.calcRemaining()), number=1))
+
+def benchAllocator(n: int = 100000):
+    '''time incremental allocation and release against replanning from scratch'''
+    rand = random.Random(0)
+    hosts = [rand.randint(1, 100) for i in range(n)]
+    allocator = SubnetAllocatorV4(SubnetV4.strToSubnetV4('10.0.0.0/8'))
+    report('allocate', n, timeit.timeit(lambda: [allocator.allocate(host) for host in hosts], number=1))
+    subnets = allocator.calcSubnets()
+    rand.shuffle(subnets)
+    report('calcRemaining', n, timeit.timeit(allocator.calcRemaining, number=n))
+    report('free', n, timeit.timeit(lambda: [allocator.free(subnet) for subnet in subnets], number=1))
+    replans = 100
+    SubnetterV4.CACHE.clear()
+    report('replan with one more subnet', replans, timeit.timeit(
+        lambda: [SubnetterV4(allocator.root, hosts + [i + 1]).calcSubnets(True) for i in range(replans)], number=1))
+
+def benchPacking(n: int = 50000, requests: int = 10000):
+    '''time packing requests around many subnets already in use'''
+    rand = random.Random(0)
+    root = SubnetV4.strToSubnetV4('10.0.0.0/8')
+    masks = [rand.randint(24, 30) for i in range(n)]
+    used = [SubnetV4(root.net_addr + (rand.getrandbits(24) & SubnetV4.ADDR_MASKS[mask]), mask) for mask in masks]
+    hosts = [rand.randint(1, 200) for i in range(requests)]
+    allocators = []
+    report('index free space around used subnets', n, timeit.timeit(lambda: allocators.append(SubnetAllocatorV4(root, used)), number=1))
+    allocator = allocators[0]
+    report('allocateMany best fit', requests, timeit.timeit(lambda: allocator.allocateMany(hosts), number=1))
+    report('calcFree', len(allocator.calcFree()), timeit.timeit(allocator.calcFree, number=1))
+
+def benchIndex(n: int = 1000000, queries: int = 10000000):
+    '''time building a prefix index and looking up addresses in it one at a time and in bulk'''
+    rand = random.Random(0)
+    subnets = [SubnetV4._unchecked(rand.getrandbits(SubnetV4.MAX_BITS), rand.randint(8, 32)) for i in range(n)]
+    addrs = array(ADDR_TYPECODE, [rand.getrandbits(SubnetV4.MAX_BITS) for i in range(queries)])
+    index = None
+    def build():
+        nonlocal index
+        index = SubnetIndexV4(subnets)
+    report('SubnetIndexV4', n, timeit.timeit(build, number=1))
+    single = addrs[:queries // 10]
+    report('lookupIndex', len(single), timeit.timeit(lambda: [index.lookupIndex(addr) for addr in single], number=1))
+    report('lookupMany', queries, timeit.timeit(lambda: index.lookupMany(addrs), number=1))
+    report('linear scan', 10, timeit.timeit(
+        lambda: [[subnet for subnet in subnets if subnet.networkAddr() <= addr <= subnet.broadcastAddr()] for addr in single[:10]],
+        number=1))
+
+def benchWorkers(n: int = 200000):
+    '''time planning many independent jobs across 1, 2, 4 and 8 worker processes'''
+    rand = random.Random(0)
+    jobs = [(SubnetV4._unchecked(rand.getrandbits(SubnetV4.MAX_BITS) & SubnetV4.ADDR_MASKS[16], 16),
+             [rand.randint(1, 500) for i in range(rand.randint(1, 20))]) for j in range(n)]
+    for workers in (1, 2, 4, 8):
+        SubnetterV4.CACHE.clear()
+        report('planMany with ' + str(workers) + ' workers', n, timeit.timeit(lambda: SubnetterV4.planMany(jobs, workers), number=1))
+
+def benchSerializers(n: int = 200000):
+    '''time writing a plan in every output format'''
+    SubnetterV4.CACHE.clear()
+    results = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), [2] * n).calcPlan()
+    for name, serializer in SERIALIZERS.items():
+        def write():
+            out = io.BytesIO() if serializer.BINARY else io.StringIO()
+            writer = serializer(out)
+            writer.writePlan(results, 1)
+            writer.close()
+        report(name, n, timeit.timeit(write, number=1))
+
+def benchLazy(n: int = 2 ** 22):
+    '''compare the time and memory of generating point to point subnets lazily against calculating them all'''
+    subnetter = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), [2] * n)
+    for name, func in (('iterSubnets', lambda: sum(1 for subnet in subnetter.iterSubnets())),
+                       ('calcSubnets', lambda: len(subnetter.calcSubnets()))):
+        SubnetterV4.CACHE.clear()
+        tracemalloc.start()
+        seconds = timeit.timeit(func, number=1)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report(name + ' (' + str(peak // 2 ** 20) + ' MiB peak)', n, seconds)
+    impossible = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), [2] * (n + 1))
+    report('isFeasible (impossible)', n, timeit.timeit(impossible.isFeasible, number=1))
+
+def benchCounted(n: int = 200000):
+    '''compare planning repetitive host requirements given flat against counted'''
+    root = SubnetV4.strToSubnetV4('10.0.0.0/8')
+    flat = [2] * n + [50] * (n // 40)
+    counted = {2: n, 50: n // 40}
+    SubnetterV4.CACHE.clear()
+    report('flat calcSubnets', len(flat), timeit.timeit(lambda: SubnetterV4(root, flat).calcSubnets(True), number=1))
+    SubnetterV4.CACHE.clear()
+    report('counted calcSubnets', len(flat), timeit.timeit(lambda: SubnetterV4(root, counted).calcSubnets(True), number=1))
+    report('counted calcRanges', len(flat), timeit.timeit(lambda: SubnetterV4(root, counted).calcRanges(), number=1))
+
+def benchSummarize(n: int = 1000000):
+    '''time summarizing and excluding many prefixes'''
+    rand = random.Random(0)
+    SubnetterV4.CACHE.clear()
+    plan = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/8'), {2: n // 2, 6: n // 4, 14: n // 4}).calcSubnets(True)
+    report('summarize adjacent plan', len(plan), timeit.timeit(lambda: SubnetV4.summarize(plan), number=1))
+    scattered = SubnetV4Array([rand.getrandbits(SubnetV4.MAX_BITS) & SubnetV4.ADDR_MASKS[24] for i in range(n)], [24] * n)
+    report('summarize scattered', n, timeit.timeit(lambda: SubnetV4.summarize(scattered), number=1))
+    report('exclude scattered', n, timeit.timeit(lambda: SubnetV4.exclude(SubnetV4(0, 0), scattered), number=1))
+
+def benchDualStack(n: int = 100000):
+    '''compare parsing, planning and formatting IPv4 against IPv6'''
+    rand = random.Random(0)
+    hosts = [rand.randint(1, 100) for i in range(n)]
+    for subnet_type, subnetter_type, parse, root in (
+            (SubnetV4, SubnetterV4, SubnetV4.strToSubnetV4, '10.0.0.0/8'),
+            (SubnetV6, SubnetterV6, SubnetV6.strToSubnetV6, '2001:db8::/32')):
+        subnets = [subnet_type._unchecked(rand.getrandbits(subnet_type.MAX_BITS), rand.randint(8, subnet_type.MAX_BITS))
+                   for i in range(n)]
+        strs = [str(subnet) for subnet in subnets]
+        name = subnet_type.VERSION + ' '
+        report(name + 'parse', n, timeit.timeit(lambda: [parse(x) for x in strs], number=1))
+        report(name + 'format', n, timeit.timeit(lambda: [str(subnet) for subnet in subnets], number=1))
+        subnetter_type.CACHE.clear()
+        subnetter = subnetter_type(parse(root), hosts)
+        report(name + 'calcSubnets', n, timeit.timeit(subnetter.calcSubnets, number=1))
+
+def benchImport(number: int = 20):
+    '''time the cold start import of each module in a fresh interpreter, less the start of the interpreter itself'''
+    def coldStart(code: str) -> float:
+        return min(timeit.repeat(lambda: subprocess.run([sys.executable, '-c', code], check=True), number=1, repeat=number))
+    base = coldStart('pass')
+    for module in ('subnet', 'subnetter', 'console'):
+        print('{:<40} {:>10.3f} ms'.format('import ' + module, (coldStart('import ' + module) - base) * 1e3))
+
+BENCHMARKS = {
+    'parse': benchParse,
+    'format': benchFormat,
+    'compact': benchCompact,
+    'arithmetic': benchArithmetic,
+    'plan': benchPlan,
+    'allocator': benchAllocator,
+    'packing': benchPacking,
+    'index': benchIndex,
+    'workers': benchWorkers,
+    'serializers': benchSerializers,
+    'lazy': benchLazy,
+    'counted': benchCounted,
+    'summarize': benchSummarize,
+    'dualstack': benchDualStack,
+    'import': benchImport,
+}
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
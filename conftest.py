@@ -0,0 +1 @@
+# the test suite imports the modules from the repository root, which pytest adds to the path for this file
@@ -1,4 +1,10 @@
-from subnetter import SubnetterV4
+import argparse
+import cProfile
+import itertools
+import sys
+
+from serializer import SERIALIZERS, TextSerializer
+from subnetter import ImpossibleSubnetError, SubnetterV4
 from subnet import SubnetV4
 
 class Console():
@@ -9,6 +15,7 @@ class Console():
     IN_PROMPT = '?> '
     ERR_PROMPT = '!> '
     OUT_PROMPT = '#> '
+    BATCH_BUFFER = 2 ** 16
 
     def help():
         '''print a help message'''
@@ -42,42 +49,149 @@ class Console():
                     if res != None:
                         Console.display(res)
 
-    def interpret(inp: str) -> (SubnetV4, [int]):
-        '''interpret an input string'''
+    def parse(inp: str) -> (SubnetV4, [int]):
+        '''parse an input string, raising a ValueError describing why it is invalid'''
         args = inp.split(' ')
         try:
             addr = SubnetV4.strToSubnetV4(args[0])
         except Exception as e:
-            print(Console.ERR_PROMPT+'Invalid network address or slash notation mask: '+str(e)+'\n')
-            return
+            raise ValueError('Invalid network address or slash notation mask: '+str(e)) from e
         hosts = []
         for i in range(1, len(args)):
             try:
                 host = int(args[i])
             except Exception as e:
-                print(Console.ERR_PROMPT+'Invalid subnet host count requirement: '+str(e)+'\n')
-                return
+                raise ValueError('Invalid subnet host count requirement: '+str(e)) from e
             hosts.append(host)
         return (addr, hosts)
 
-    def calculate(args: (SubnetV4, [int])) -> ([SubnetV4], int):
-        '''calculate the subnets for an input'''
+    def interpret(inp: str) -> (SubnetV4, [int]):
+        '''interpret an input string'''
+        try:
+            return Console.parse(inp)
+        except ValueError as e:
+            print(Console.ERR_PROMPT+str(e)+'\n')
+            return
+
+    def plan(args: (SubnetV4, [int])) -> ([SubnetV4], int):
+        '''calculate the subnets for an input, raising a ValueError describing why it cannot be done'''
         try:
             subnetter = SubnetterV4(*args)
         except Exception as e:
-            print(Console.ERR_PROMPT+'Invalid input: '+str(e)+'\n')
-            return
+            raise ValueError('Invalid input: '+str(e)) from e
         try:
-            return (subnetter.calcSubnets(), subnetter.calcRemaining())
+            subnets, remaining = subnetter.calcPlan()
         except Exception as e:
-            print(Console.ERR_PROMPT+'Impossible subnetting request: '+str(e)+'\n')
+            raise ValueError('Impossible subnetting request: '+str(e)) from e
+        return (list(subnets), remaining)
+
+    def calculate(args: (SubnetV4, [int])) -> ([SubnetV4], int):
+        '''calculate the subnets for an input'''
+        try:
+            return Console.plan(args)
+        except ValueError as e:
+            print(Console.ERR_PROMPT+str(e)+'\n')
             return
 
+    def describe(results: ([SubnetV4], int)):
+        '''generate the lines describing the resulting subnets'''
+        for subnet in results[0]:
+            yield str(subnet)+' with '+str(subnet.useableAddr())+' usable network addresses.'
+        yield 'With '+str(results[1])+' network addresses remaining.'
+
     def display(results: ([SubnetV4], int)):
         '''display the resulting subnets'''
-        for subnet in results[0]:
-            print(Console.OUT_PROMPT+str(subnet)+' with '+str(subnet.useableAddr())+' usable network addresses.')
-        print(Console.OUT_PROMPT+'With '+str(results[1])+' network addresses remaining.\n')
+        for line in Console.describe(results):
+            print(Console.OUT_PROMPT+line)
+        print()
+
+    def requests(inp):
+        '''generate the line number and parsed request, or the ValueError describing why it is invalid,
+        of every non-empty line from a stream'''
+        for line_no, com in enumerate(inp, 1):
+            com = com.strip()
+            if com == '':
+                continue
+            try:
+                yield (line_no, Console.parse(com))
+            except ValueError as e:
+                yield (line_no, e)
+
+    def batch(inp, out, workers: int = 1, serializer = TextSerializer):
+        '''calculate every request line from a stream without prompts, using several worker processes if requested,
+        streaming each result or error record to another stream through a serializer as soon as it is calculated'''
+        writer = serializer(out)
+        requests, jobs = itertools.tee(Console.requests(inp))
+        # only valid lines are calculated, so the plans are in line with the valid requests
+        plans = SubnetterV4.iterPlans((args for line_no, args in jobs if not isinstance(args, ValueError)), workers)
+        for line_no, args in requests:
+            if isinstance(args, ValueError):
+                writer.writeError(str(args), line_no)
+                continue
+            results = next(plans)
+            if isinstance(results, ImpossibleSubnetError):
+                writer.writeError('Impossible subnetting request: '+str(results), line_no)
+            elif isinstance(results, Exception):
+                writer.writeError('Invalid input: '+str(results), line_no)
+            else:
+                writer.writePlan(results, line_no)
+        # finish the plans so any worker processes are shut down
+        plans.close()
+        writer.close()
+
+    def positiveInt(value: str) -> int:
+        '''parse a command line option that must be an integer greater than 0'''
+        try:
+            num = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError('must be an integer, not '+repr(value))
+        if num < 1:
+            raise argparse.ArgumentTypeError('must be greater than 0, not '+str(num))
+        return num
+
+    def runBatch(path: str = '-', workers: int = 1, serializer = TextSerializer):
+        '''run a batch from a file, or standard input for '-', writing to standard output'''
+        out = open(sys.stdout.fileno(), 'wb' if serializer.BINARY else 'w', buffering=Console.BATCH_BUFFER, closefd=False)
+        try:
+            if path == '-':
+                Console.batch(sys.stdin, out, workers, serializer)
+            else:
+                with open(path) as inp:
+                    Console.batch(inp, out, workers, serializer)
+        finally:
+            out.flush()
 
 if __name__ == '__main__':
-    Console.main()
+    parser = argparse.ArgumentParser(description='The Mader Subnet Calculator.')
+    parser.add_argument('--batch', nargs='?', const='-', metavar='FILE',
+                        help='calculate every line of FILE (or standard input) without prompts instead of running interactively')
+    parser.add_argument('--workers', type=Console.positiveInt, default=1, metavar='N',
+                        help='calculate large batches across N worker processes')
+    parser.add_argument('--format', choices=SERIALIZERS, default='text',
+                        help='the output format of a batch')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the time spent in and the calls of every stage with the request, subnet, byte and cache counts to standard error on exit')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='profile the calculator, dumping the statistics to FILE for pstats')
+    options = parser.parse_args()
+    stats = None
+    if options.stats:
+        from instrument import Instrumentation
+        stats = Instrumentation()
+        stats.install(Console)
+    profiler = None
+    if options.profile is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        if options.batch is None:
+            Console.main()
+        else:
+            Console.runBatch(options.batch, options.workers, SERIALIZERS[options.format])
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(options.profile)
+        if stats is not None:
+            stats.uninstall()
+            print(stats.summary(), file=sys.stderr)
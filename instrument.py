@@ -0,0 +1,169 @@
+import contextlib
+import sys
+import time
+
+from serializer import SERIALIZERS, Serializer
+from subnetter import SubnetterV4
+
+class CountingStream():
+    '''a stream counting the bytes written through it to another stream,
+    encoding text the same way the other stream does to count it'''
+
+    def __init__(self, out, stats):
+        self.out = out
+        self.stats = stats
+        self.encoding = getattr(out, 'encoding', None) or 'utf-8'
+        self.errors = getattr(out, 'errors', None) or 'strict'
+        return
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            self.stats.count('bytes written', len(data.encode(self.encoding, self.errors)))
+        else:
+            self.stats.count('bytes written', len(data))
+        return self.out.write(data)
+
+    def __getattr__(self, name: str):
+        return getattr(self.out, name)
+
+class Instrumentation():
+    '''opt-in timers and counters for the read, parse, plan and display stages of the calculator,
+    installed by wrapping the functions of each stage so nothing is slowed down unless it is installed'''
+    STAGES = ('read', 'parse', 'plan', 'display')
+
+    def __init__(self):
+        # the time spent in each stage excluding the stages it calls, so nested stages are not counted twice
+        self.seconds = dict.fromkeys(Instrumentation.STAGES, 0.0)
+        self.calls = dict.fromkeys(Instrumentation.STAGES, 0)
+        self.counters = {'requests': 0, 'subnets': 0, 'errors': 0, 'bytes written': 0}
+        self.stack = []
+        self.stage = None
+        self.mark = 0.0
+        self.wrapped = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+        return
+
+    def count(self, name: str, n: int = 1):
+        '''add to a counter'''
+        self.counters[name] += n
+
+    def enter(self, stage: str):
+        '''start timing a stage, pausing the stage it was called from'''
+        now = time.perf_counter()
+        if self.stage is not None:
+            self.seconds[self.stage] += now - self.mark
+        self.stack.append(self.stage)
+        self.stage = stage
+        self.calls[stage] += 1
+        self.mark = now
+
+    def exit(self):
+        '''stop timing the current stage, resuming the stage it was called from'''
+        now = time.perf_counter()
+        self.seconds[self.stage] += now - self.mark
+        self.stage = self.stack.pop()
+        self.mark = now
+
+    def countParse(self, results):
+        '''count a request, and the exception explaining why it could not be parsed'''
+        self.count('requests')
+        if isinstance(results, Exception):
+            self.count('errors')
+
+    def countPlan(self, results):
+        '''count the subnets of a plan, or the exception explaining why it could not be calculated'''
+        if isinstance(results, Exception):
+            self.count('errors')
+        else:
+            self.count('subnets', len(results[0]))
+
+    def timed(self, func, stage: str, counter = None):
+        '''wrap a function to time its calls as a stage, passing each result or exception to a counter'''
+        def wrapper(*args, **kwargs):
+            self.enter(stage)
+            try:
+                res = func(*args, **kwargs)
+            except Exception as e:
+                if counter is not None:
+                    counter(e)
+                raise
+            finally:
+                self.exit()
+            if counter is not None:
+                counter(res)
+            return res
+        return wrapper
+
+    def timedIter(self, func, stage: str, counter = None):
+        '''wrap a generator function to time the calculation of every item it generates as a stage'''
+        def wrapper(*args, **kwargs):
+            items = iter(func(*args, **kwargs))
+            while True:
+                self.enter(stage)
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                finally:
+                    self.exit()
+                if counter is not None:
+                    counter(item)
+                yield item
+        return wrapper
+
+    def counted(self, func):
+        '''wrap a function writing to an output stream, counting what it writes'''
+        def wrapper(inp, out, *args, **kwargs):
+            return func(inp, CountingStream(out, self), *args, **kwargs)
+        return wrapper
+
+    def countedStdout(self, func):
+        '''wrap a function printing to standard output, counting what it prints'''
+        def wrapper(*args, **kwargs):
+            with contextlib.redirect_stdout(CountingStream(sys.stdout, self)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def wrap(self, owner, name: str, wrapper):
+        '''replace an attribute of a class with a wrapper of it until uninstalled'''
+        func = owner.__dict__[name]
+        self.wrapped.append((owner, name, func))
+        setattr(owner, name, wrapper(func))
+
+    def install(self, console):
+        '''start timing and counting the stages of a console class and its batches'''
+        self.wrap(console, 'requests', lambda func: self.timedIter(func, 'read'))
+        self.wrap(console, 'parse', lambda func: self.timed(func, 'parse', self.countParse))
+        self.wrap(console, 'plan', lambda func: self.timed(func, 'plan', self.countPlan))
+        self.wrap(SubnetterV4, 'iterPlans', lambda func: self.timedIter(func, 'plan', self.countPlan))
+        self.wrap(console, 'display', lambda func: self.timed(func, 'display'))
+        self.wrap(console, 'display', self.countedStdout)
+        self.wrap(console, 'batch', self.counted)
+        for serializer in set(SERIALIZERS.values()) | {Serializer}:
+            for name in ('writePlan', 'writeError', 'close'):
+                if name in serializer.__dict__:
+                    self.wrap(serializer, name, lambda func: self.timed(func, 'display'))
+        self.cache_hits = SubnetterV4.CACHE.hits
+        self.cache_misses = SubnetterV4.CACHE.misses
+
+    def uninstall(self):
+        '''restore the wrapped functions, latest first'''
+        self.cache_hits = SubnetterV4.CACHE.hits - self.cache_hits
+        self.cache_misses = SubnetterV4.CACHE.misses - self.cache_misses
+        while self.wrapped:
+            owner, name, func = self.wrapped.pop()
+            setattr(owner, name, func)
+
+    def summary(self) -> str:
+        '''a table of the time and calls of every stage and the counters'''
+        lines = ['stage        calls      seconds']
+        for stage in Instrumentation.STAGES:
+            lines.append(format(stage, '<8') + format(self.calls[stage], '>10') + format(self.seconds[stage], '>13.6f'))
+        lines.append('total   ' + format(sum(self.seconds.values()), '>23.6f'))
+        for name, value in self.counters.items():
+            lines.append(name + ': ' + str(value))
+        # plans calculated by worker processes use their own caches, which are not counted
+        lines.append('plan cache hits: ' + str(self.cache_hits))
+        lines.append('plan cache misses: ' + str(self.cache_misses))
+        return '\n'.join(lines)
@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import random
+import time
+
+def randomRequest(rng: random.Random, hosts: int) -> bytes:
+    '''a random request line for a /8 root with a number of sub-networks'''
+    return ('10.0.0.0/8 ' + ' '.join(str(rng.randint(1, 2000)) for i in range(hosts)) + '\n').encode()
+
+async def client(host: str, port: int, requests: [bytes], latencies: [float]):
+    '''send requests over one connection, one at a time, recording the latency of each response'''
+    reader, writer = await asyncio.open_connection(host, port, limit=2 ** 24)
+    try:
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            await reader.readline()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+def percentile(values: [float], fraction: float) -> float:
+    '''the value below which a fraction of the sorted values fall'''
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+async def run(host: str, port: int, connections: int, requests: int, hosts: int, distinct: int, seed: int):
+    '''load a server from several connections at once and report the latency percentiles and throughput'''
+    rng = random.Random(seed)
+    # a limited pool of distinct requests so identical ones are in flight together and can be coalesced
+    pool = [randomRequest(rng, hosts) for i in range(distinct)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, [rng.choice(pool) for i in range(requests)], latencies)
+                           for connection in range(connections)))
+    seconds = time.perf_counter() - start
+    latencies.sort()
+    print(str(len(latencies)) + ' requests over ' + str(connections) + ' connections in ' + format(seconds, '.3f') + ' s')
+    print('throughput: ' + format(len(latencies) / seconds, '.1f') + ' requests/s')
+    print('p50: ' + format(percentile(latencies, 0.5) * 1000, '.3f') + ' ms')
+    print('p99: ' + format(percentile(latencies, 0.99) * 1000, '.3f') + ' ms')
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='A load generator for the subnet calculator service.')
+    parser.add_argument('--host', default='127.0.0.1', help='the address of the server')
+    parser.add_argument('--port', type=int, default=8642, help='the port of the server')
+    parser.add_argument('--connections', type=int, default=16, help='the number of concurrent connections')
+    parser.add_argument('--requests', type=int, default=200, help='the number of requests sent over each connection')
+    parser.add_argument('--hosts', type=int, default=32, help='the number of sub-networks in every request')
+    parser.add_argument('--distinct', type=int, default=64, help='the number of distinct requests sent')
+    parser.add_argument('--seed', type=int, default=0, help='the seed of the random requests')
+    options = parser.parse_args()
+    asyncio.run(run(options.host, options.port, options.connections, options.requests, options.hosts,
+                    options.distinct, options.seed))
@@ -0,0 +1,129 @@
+import csv
+import json
+import struct
+
+from subnet import SubnetV4, SubnetV4Array
+
+class Serializer():
+    '''a writer streaming subnetting plans and errors to an output stream as they are calculated'''
+    BINARY = False
+    CHUNK = 4096
+
+    def __init__(self, out):
+        self.out = out
+        return
+
+    def subnetRows(subnets):
+        '''generate the string and number of usable addresses of every subnet,
+        formatting a SubnetV4Array a chunk at a time'''
+        if not isinstance(subnets, SubnetV4Array):
+            for subnet in subnets:
+                yield (str(subnet), subnet.useableAddr())
+            return
+        sizes = SubnetV4.SIZES
+        for start in range(0, len(subnets), Serializer.CHUNK):
+            masks = subnets.masks[start:start + Serializer.CHUNK]
+            strs = SubnetV4.formatMany(subnets.net_addrs[start:start + Serializer.CHUNK], masks)
+            yield from zip(strs, [sizes[mask] - 2 for mask in masks])
+
+    def writePlan(self, results: ([SubnetV4], int), line_no: int = None):
+        '''write the subnets and remaining network addresses of a plan'''
+        raise NotImplementedError()
+
+    def writeError(self, message: str, line_no: int = None):
+        '''write a record of a request that could not be calculated'''
+        raise NotImplementedError()
+
+    def close(self):
+        '''finish the output'''
+        self.out.flush()
+
+class TextSerializer(Serializer):
+    '''writes plans as the human readable prose of the console'''
+
+    def writePlan(self, results: ([SubnetV4], int), line_no: int = None):
+        write = self.out.write
+        for subnet, usable in Serializer.subnetRows(results[0]):
+            write(subnet+' with '+str(usable)+' usable network addresses.\n')
+        write('With '+str(results[1])+' network addresses remaining.\n\n')
+
+    def writeError(self, message: str, line_no: int = None):
+        if line_no is None:
+            self.out.write('Error: '+message+'\n\n')
+        else:
+            self.out.write('Error on line '+str(line_no)+': '+message+'\n\n')
+
+class JsonLinesSerializer(Serializer):
+    '''writes a JSON object per line for every subnet, then one with the remaining network addresses of the plan'''
+
+    def writePlan(self, results: ([SubnetV4], int), line_no: int = None):
+        write = self.out.write
+        line = json.dumps(line_no)
+        for subnet, usable in Serializer.subnetRows(results[0]):
+            write('{"line": '+line+', "subnet": "'+subnet+'", "usable": '+str(usable)+'}\n')
+        write('{"line": '+line+', "remaining": '+str(results[1])+'}\n')
+
+    def writeError(self, message: str, line_no: int = None):
+        self.out.write(json.dumps({'line': line_no, 'error': message})+'\n')
+
+class CsvSerializer(Serializer):
+    '''writes a CSV row for every subnet, then one with the remaining network addresses of the plan'''
+    HEADER = ('line', 'subnet', 'usable', 'remaining', 'error')
+
+    def __init__(self, out):
+        super().__init__(out)
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.writer.writerow(CsvSerializer.HEADER)
+        return
+
+    def writePlan(self, results: ([SubnetV4], int), line_no: int = None):
+        self.writer.writerows((line_no, subnet, usable, '', '') for subnet, usable in Serializer.subnetRows(results[0]))
+        self.writer.writerow((line_no, '', '', results[1], ''))
+
+    def writeError(self, message: str, line_no: int = None):
+        self.writer.writerow((line_no, '', '', '', message))
+
+class BinarySerializer(Serializer):
+    '''writes fixed width little endian records of a 32 bit network address and an 8 bit slash notation mask
+    so the output can be memory mapped, ending every plan with a record holding the remaining network addresses
+    and marked by PLAN_END in place of the mask, and recording errors by their line number marked by ERROR'''
+    BINARY = True
+    RECORD = struct.Struct('<IB')
+    PLAN_END = 255
+    ERROR = 254
+
+    def writePlan(self, results: ([SubnetV4], int), line_no: int = None):
+        write = self.out.write
+        pack = BinarySerializer.RECORD.pack
+        subnets = results[0]
+        if isinstance(subnets, SubnetV4Array):
+            for net_addr, mask in zip(subnets.net_addrs, subnets.masks):
+                write(pack(net_addr, mask))
+        else:
+            for subnet in subnets:
+                write(pack(subnet.net_addr, subnet.mask))
+        write(pack(results[1], BinarySerializer.PLAN_END))
+
+    def writeError(self, message: str, line_no: int = None):
+        self.out.write(BinarySerializer.RECORD.pack(line_no or 0, BinarySerializer.ERROR))
+
+    def readPlans(buffer):
+        '''generate the (SubnetV4Array, remaining) plans, or the line numbers of errors, stored in a buffer
+        (such as bytes or an mmap) of records'''
+        subnets = SubnetV4Array()
+        for net_addr, mask in BinarySerializer.RECORD.iter_unpack(buffer):
+            if mask == BinarySerializer.PLAN_END:
+                yield (subnets, net_addr)
+                subnets = SubnetV4Array()
+            elif mask == BinarySerializer.ERROR:
+                yield net_addr
+            else:
+                subnets.net_addrs.append(net_addr)
+                subnets.masks.append(mask)
+
+SERIALIZERS = {
+    'text': TextSerializer,
+    'jsonl': JsonLinesSerializer,
+    'csv': CsvSerializer,
+    'binary': BinarySerializer,
+}
@@ -0,0 +1,143 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from console import Console
+from subnet import SubnetV4
+from subnetter import ImpossibleSubnetError, SubnetterV4
+
+class PlanServer():
+    '''an asyncio line protocol server calculating a subnetting request per line,
+    in the same format as the console, and answering each with a line of JSON'''
+    MAX_LINE = 2 ** 16
+    MAX_HOSTS = 2 ** 14
+    MAX_PLANS = 64
+    LARGE_PLAN = 256
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8642, workers: int = None):
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.executor = None
+        self.server = None
+        # the futures of the responses being calculated, keyed like the plan cache so identical requests share one
+        self.in_flight = {}
+        self.coalesced = 0
+        self.plans = None
+        return
+
+    def respond(root: SubnetV4, hosts: [int]) -> str:
+        '''calculate the JSON response line for a request'''
+        try:
+            subnets, remaining = SubnetterV4(root, hosts).calcPlan()
+        except ImpossibleSubnetError as e:
+            return PlanServer.error('Impossible subnetting request: '+str(e))
+        return ('{"subnets": [' + ', '.join(['"' + subnet + '"' for subnet in SubnetV4.formatMany(subnets.net_addrs, subnets.masks)])
+                + '], "remaining": ' + str(remaining) + '}\n')
+
+    def error(message: str) -> str:
+        '''the JSON response line for a request that cannot be calculated'''
+        return json.dumps({'error': message}) + '\n'
+
+    async def plan(self, root: SubnetV4, hosts: [int]) -> str:
+        '''calculate the response for a request, sharing it with identical requests already being calculated
+        and calculating large plans in the executor so the event loop is not blocked'''
+        try:
+            subnetter = SubnetterV4(root, hosts)
+            key = (root, tuple(subnetter.blockCounts()))
+        except ImpossibleSubnetError as e:
+            return PlanServer.error('Impossible subnetting request: '+str(e))
+        except Exception as e:
+            return PlanServer.error('Invalid input: '+str(e))
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # only this request being cancelled stops it, not the one it shares being cancelled
+                if not future.cancelled():
+                    raise
+                return PlanServer.error('Failed to calculate: the identical request being calculated was cancelled')
+        if len(hosts) < PlanServer.LARGE_PLAN:
+            return PlanServer.respond(root, hosts)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.in_flight[key] = future
+        try:
+            async with self.plans:
+                res = await loop.run_in_executor(self.executor, PlanServer.respond, root, hosts)
+        except Exception as e:
+            res = PlanServer.error('Failed to calculate: '+str(e))
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self.in_flight[key]
+        future.set_result(res)
+        return res
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        '''answer every request line of a connection in order until it closes'''
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(PlanServer.error('Request lines must be at most '+str(PlanServer.MAX_LINE)+' bytes long').encode())
+                    break
+                if not line:
+                    break
+                com = line.decode(errors='replace').strip()
+                if com == '':
+                    continue
+                try:
+                    root, hosts = Console.parse(com)
+                except ValueError as e:
+                    res = PlanServer.error(str(e))
+                else:
+                    if len(hosts) > PlanServer.MAX_HOSTS:
+                        res = PlanServer.error('Requests must have at most '+str(PlanServer.MAX_HOSTS)+' sub-networks, not '+str(len(hosts)))
+                    else:
+                        res = await self.plan(root, hosts)
+                writer.write(res.encode())
+                # stop reading further requests while the client is not keeping up with the responses
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        '''start listening for connections'''
+        self.executor = ProcessPoolExecutor(self.workers)
+        self.plans = asyncio.Semaphore(PlanServer.MAX_PLANS)
+        self.server = await asyncio.start_server(self.handle, self.host, self.port, limit=PlanServer.MAX_LINE)
+        return self.server
+
+    async def stop(self):
+        '''stop listening for connections and shut down the executor'''
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown()
+
+    async def serve(self):
+        '''listen for connections until cancelled'''
+        await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='The Mader Subnet Calculator as a line protocol service.')
+    parser.add_argument('--host', default='127.0.0.1', help='the address to listen on')
+    parser.add_argument('--port', type=int, default=8642, help='the port to listen on')
+    parser.add_argument('--workers', type=Console.positiveInt, default=None, metavar='N', help='the number of processes calculating large plans')
+    options = parser.parse_args()
+    try:
+        asyncio.run(PlanServer(options.host, options.port, options.workers).serve())
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,12 @@
+import string
+import struct
+from array import array
+
 class MaskSepCountError(ValueError):
     '''incorrect number of mask separators'''
-    def __init__(self, count: int, targ: int):
+    def __init__(self, count: int, targ: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(count, int):
             raise TypeError('\'count\' must be an integer, not a '+str(type(count)))
         if count < 0:
@@ -11,7 +17,7 @@ class MaskSepCountError(ValueError):
             raise ValueError('\'count\' and \'targ\' cannot be equal if there is indeed an error')
         self.count = count
         self.targ = targ
-        mes = ('There must be exactly '+str(targ)+' occurance',' of the mask separator ('+SubnetV4.MASK_SEP+') but '+str(count)+' ',' found!')
+        mes = ('There must be exactly '+str(targ)+' occurance',' of the mask separator ('+subnet_type.MASK_SEP+') but '+str(count)+' ',' found!')
         if targ != 1:
             mes = ('s'.join(mes[:2]), mes[2])
         else:
@@ -27,14 +33,16 @@ class MaskSepCountError(ValueError):
 
 class MaskTooBigError(ValueError):
     '''mask exceeds address bit capacity'''
-    def __init__(self, mask: int):
+    def __init__(self, mask: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(mask, int):
             raise TypeError('\'mask\' must be an integer, not a '+str(type(mask)))
-        if mask < SubnetV4.MAX_BITS:
-            raise ValueError('\'mask\' must be greater than or equal to '+str(SubnetV4.MAX_BITS)+' if there is indeed an error, not '+str(mask))
+        if mask < subnet_type.MAX_BITS:
+            raise ValueError('\'mask\' must be greater than or equal to '+str(subnet_type.MAX_BITS)+' if there is indeed an error, not '+str(mask))
         self.mask = mask
         self.mes = ('The slash notation mask must be less than the maximum number of bits in an address ('
-                   +str(SubnetV4.MAX_BITS)+') for there to be both network and host bits; '+str(mask)+' is too big!')
+                   +str(subnet_type.MAX_BITS)+') for there to be both network and host bits; '+str(mask)+' is too big!')
 
     def __str__(self) -> str:
         return self.mes
@@ -54,7 +62,9 @@ class MaskTooSmallError(ValueError):
 
 class AddrSepCountError(ValueError):
     '''incorrect number of address separators'''
-    def __init__(self, count: int, targ: int):
+    def __init__(self, count: int, targ: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(count, int):
             raise TypeError('\'count\' must be an integer, not a '+str(type(count)))
         if count < 0:
@@ -65,7 +75,7 @@ class AddrSepCountError(ValueError):
             raise ValueError('\'mask\' and \'targ\' cannot be equal if there is indeed an error')
         self.count = count
         self.targ = targ
-        mes = ('There must be exactly '+str(targ)+' occurance',' of the address separator ('+SubnetV4.ADDR_SEP+') but '+str(count)+' ',' found!')
+        mes = ('There must be exactly '+str(targ)+' occurance',' of the address separator ('+subnet_type.ADDR_SEP+') but '+str(count)+' ',' found!')
         if targ != 1:
             mes = (''.join(mes[:2]), mes[2])
         else:
@@ -81,14 +91,19 @@ class AddrSepCountError(ValueError):
 
 class AddrTooBigError(ValueError):
     '''integer address exceeds bit capacity'''
-    def __init__(self, addr: int):
+    def __init__(self, addr: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(addr, int):
             raise TypeError('\'addr\' must be an integer, not a '+str(type(addr)))
-        if addr < 2 ** SubnetV4.MAX_BITS:
-            raise ValueError('\'addr\' must be '+str(2**SubnetV4.MAX_BITS)+' or greater if there is indeed an error, not '+str(addr))
+        if addr < 2 ** subnet_type.MAX_BITS:
+            raise ValueError('\'addr\' must be '+str(2**subnet_type.MAX_BITS)+' or greater if there is indeed an error, not '+str(addr))
         self.addr = addr
-        ValueError('The integer value of an address must be less than '+str(2**SubnetV4.MAX_BITS)
-                   +' for it to fit in the allocated bits ('+str(SubnetV4.MAX_BITS)+'); '+str(addr)+' is too big!')        
+        self.mes = ('The integer value of an address must be less than '+str(2**subnet_type.MAX_BITS)
+                   +' for it to fit in the allocated bits ('+str(subnet_type.MAX_BITS)+'); '+str(addr)+' is too big!')
+
+    def __str__(self) -> str:
+        return self.mes
 
 class AddrTooSmallError(ValueError):
     '''integer address is negative'''
@@ -105,14 +120,16 @@ class AddrTooSmallError(ValueError):
 
 class AddrPartTooBigError(ValueError):
     '''part of an address exceeds limit'''
-    def __init__(self, addr_part: int):
+    def __init__(self, addr_part: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(addr_part, int):
             raise TypeError('\'addr_part\' must be an integer, not a '+str(type(addr_part)))
-        if addr_part < 2 ** (SubnetV4.MAX_BITS // SubnetV4.ADDR_DIVISIONS):
-            raise ValueError('\'addr_part\' must be '+str(2**(SubnetV4.MAX_BITS//SubnetV4.ADDR_DIVISIONS))
+        if addr_part < 2 ** (subnet_type.MAX_BITS // subnet_type.ADDR_DIVISIONS):
+            raise ValueError('\'addr_part\' must be '+str(2**(subnet_type.MAX_BITS//subnet_type.ADDR_DIVISIONS))
                              +' or greater if there is indeed an error, not '+str(addr_part))
         self.addr_part = addr_part
-        self.mes = ('Every part of an IPv4 network address must be lesser than '+str(2**(SubnetV4.MAX_BITS//SubnetV4.ADDR_DIVISIONS))
+        self.mes = ('Every part of an '+subnet_type.VERSION+' network address must be lesser than '+str(2**(subnet_type.MAX_BITS//subnet_type.ADDR_DIVISIONS))
                    +' for the entire address to fit in the allocated bits; '+str(addr_part)+' is too big!')
 
     def __str__(self) -> str:
@@ -120,31 +137,83 @@ class AddrPartTooBigError(ValueError):
 
 class AddrPartTooSmallError(ValueError):
     '''part of an address is negative'''
-    def __init__(self, addr_part: int):
+    def __init__(self, addr_part: int, subnet_type: type = None):
+        if subnet_type is None:
+            subnet_type = SubnetV4
         if not isinstance(addr_part, int):
             raise TypeError('\'addr_part\' must be an integer, not a '+str(type(addr_part)))
         if addr_part >= 0:
             raise ValueError('\'addr_part\' must be less than 0 if there is indeed an error, not '+str(addr_part))
         self.addr_part = addr_part
-        self.mes = ('Every part of an IPv4 network address must be 0 or greater for it to be unsigned; '
+        self.mes = ('Every part of an '+subnet_type.VERSION+' network address must be 0 or greater for it to be unsigned; '
                    +str(addr_part)+' is too small!')
 
     def __str__(self) -> str:
         return self.mes
 
+def _mergeRanges(ranges):
+    '''sort (start, end) address ranges, generating them with those that overlap or are adjacent merged'''
+    ranges = sorted(ranges)
+    if not ranges:
+        return
+    start, end = ranges[0]
+    for next_start, next_end in ranges:
+        if next_start > end:
+            yield (start, end)
+            start = next_start
+        if next_end > end:
+            end = next_end
+    yield (start, end)
+
+def _blocks(start: int, end: int, max_bits: int):
+    '''generate the (network address, slash notation mask) of the fewest aligned blocks
+    exactly covering the addresses from start up to but excluding end'''
+    while start < end:
+        # the largest block both aligned at the start and fitting before the end
+        bits = (end - start).bit_length() - 1
+        if start:
+            bits = min(bits, (start & -start).bit_length() - 1)
+        yield (start, max_bits - bits)
+        start += 1 << bits
+
+def _freeBlocks(start: int, end: int, used, max_bits: int):
+    '''generate the fewest aligned blocks covering the addresses from start up to but excluding end
+    outside of some used (start, end) ranges'''
+    for used_start, used_end in _mergeRanges(used):
+        if used_end <= start:
+            continue
+        if used_start >= end:
+            break
+        yield from _blocks(start, used_start, max_bits)
+        start = max(start, used_end)
+    yield from _blocks(start, end, max_bits)
+
+ADDR_TYPECODE = 'I' if array('I').itemsize >= 4 else 'L'
+MASK_TYPECODE = 'B'
+COUNT_TYPECODE = 'q'
+
 class SubnetV4():
     '''a representation of a subnetwork using IPv4'''
+    VERSION = 'IPv4'
     MAX_BITS = 32
     ADDR_DIVISIONS = 4
     ADDR_SEP = '.'
     MASK_SEP = '/'
-    
+    PART_BITS = MAX_BITS // ADDR_DIVISIONS
+    PART_MASK = 2 ** PART_BITS - 1
+    PART_SHIFTS = tuple(range(PART_BITS * (ADDR_DIVISIONS - 1), -1, -PART_BITS))
+    ADDR_BYTES = MAX_BITS // 8
+    ADDR_LIMIT = 2 ** MAX_BITS
+    SIZES = tuple(map((2).__pow__, range(MAX_BITS, -1, -1)))
+    ADDR_MASKS = tuple(map(ADDR_LIMIT.__sub__, SIZES))
+    __slots__ = ('net_addr', 'mask')
+
     def __init__(self, net_addr: int = 0, mask: int = 32):
         if not isinstance(net_addr, int):
             raise TypeError('\'net_addr\' must be an integer, not a ' + str(type(net_addr)))
         if not isinstance(mask, int):
             raise TypeError('\'mask\' must be an integer, not a ' + str(type(mask)))
-        if net_addr >= 2 ** SubnetV4.MAX_BITS:
+        if net_addr >= SubnetV4.ADDR_LIMIT:
             raise AddrTooBigError(net_addr)
         if net_addr < 0:
             raise AddrTooSmallError(net_addr)
@@ -156,22 +225,28 @@ class SubnetV4():
         self.mask = mask
         return
 
+    def _unchecked(net_addr: int, mask: int):
+        '''create a SubnetV4 without validating the arguments, for trusted internal callers only'''
+        subnet = object.__new__(SubnetV4)
+        subnet.net_addr = net_addr
+        subnet.mask = mask
+        return subnet
+
     def __eq__(self, other) -> bool:
         if isinstance(other, SubnetV4):
             return self.net_addr == other.net_addr and self.mask == other.mask
         else:
             return False
 
+    def __hash__(self) -> int:
+        return hash((self.net_addr, self.mask))
+
     def __repr__(self) -> str:
         return 'SubnetV4(' + repr(self.net_addr) + ',' + repr(self.mask) + ')'
 
     def __str__(self) -> str:
-        addr_parts = SubnetV4.intToAddr(self.net_addr)
-        string = ''
-        i = 0
-        for i in range(0,len(addr_parts)):
-            string += str(addr_parts[i]) + SubnetV4.ADDR_SEP
-        return string[0:-len(SubnetV4.ADDR_SEP)] + SubnetV4.MASK_SEP + str(self.mask)
+        return (SubnetV4.ADDR_SEP.join(map(str, SubnetV4.intToAddr(self.net_addr)))
+                + SubnetV4.MASK_SEP + str(self.mask))
 
     def strToSubnetV4(x: str):
         '''convert a string into a SubnetV4'''
@@ -205,17 +280,9 @@ class SubnetV4():
             raise TypeError('\'x\' must be an integer, not a ' + str(type(x)))
         if x < 0:
             raise AddrTooSmallError(x)
-        if x >= 2 ** SubnetV4.MAX_BITS:
+        if x >= SubnetV4.ADDR_LIMIT:
             raise AddrTooBigError(x)
-        base = 2 ** (SubnetV4.MAX_BITS // SubnetV4.ADDR_DIVISIONS)
-        i = SubnetV4.ADDR_DIVISIONS - 1
-        addr = []
-        while i >= 0:
-            num = x // (base ** i)
-            addr.append(num)
-            x -= num * base ** i
-            i -= 1
-        return tuple(addr)
+        return tuple(x.to_bytes(SubnetV4.ADDR_BYTES, 'big'))
 
     def addrToInt(x: tuple) -> int:
         '''convert a tuple address to an integer'''
@@ -223,22 +290,98 @@ class SubnetV4():
             raise TypeError('\'x\' must be a tuple, not a ' + str(type(x)))
         if len(x) != SubnetV4.ADDR_DIVISIONS:
             raise ValueError('\'x\' must be ' + str(SubnetV4.ADDR_DIVISIONS) + ' long, not ' + str(len(x)))
-        x = list(x)
-        x.reverse()
-        base = 2 ** (SubnetV4.MAX_BITS // SubnetV4.ADDR_DIVISIONS)
-        i = 0
-        addr = 0
-        while i < SubnetV4.ADDR_DIVISIONS:
-            if not isinstance(x[i], int):
-                raise TypeError('every element of \'x\' must be an integer, not a ' + str(type(x[i])))
-            if x[i] >= base:
-                raise AddrPartTooBigError(x[i])
-            if x[i] < 0:
-                raise AddrPartTooSmallError(x[i])
-            num = x[i] * base ** i
-            addr += num
-            i += 1
-        return addr
+        try:
+            return int.from_bytes(bytes(x), 'big')
+        except (TypeError, ValueError):
+            for part in x:
+                if not isinstance(part, int):
+                    raise TypeError('every element of \'x\' must be an integer, not a ' + str(type(part)))
+                if part > SubnetV4.PART_MASK:
+                    raise AddrPartTooBigError(part)
+                if part < 0:
+                    raise AddrPartTooSmallError(part)
+            raise
+
+    def parseMany(strs) -> (array, array, dict):
+        '''convert an iterable of strings into packed arrays of network addresses and masks in the same rows,
+        along with a dictionary of the error raised by each invalid row keyed by its position,
+        holding a placeholder network address and mask of 0 in the arrays'''
+        bits = SubnetV4.PART_BITS
+        part_mask = SubnetV4.PART_MASK
+        net_addrs = array(ADDR_TYPECODE)
+        masks = array(MASK_TYPECODE)
+        errors = {}
+        for row, x in enumerate(strs):
+            try:
+                if not isinstance(x, str):
+                    raise TypeError('\'x\' must be a string, not a ' + str(type(x)))
+                if x.count(SubnetV4.MASK_SEP) != 1:
+                    raise MaskSepCountError(x.count(SubnetV4.MASK_SEP), 1)
+                addr_str, sep, mask_str = x.partition(SubnetV4.MASK_SEP)
+                parts = addr_str.split(SubnetV4.ADDR_SEP)
+                if len(parts) != SubnetV4.ADDR_DIVISIONS:
+                    raise AddrSepCountError(len(parts) - 1, SubnetV4.ADDR_DIVISIONS - 1)
+                net_addr = 0
+                for part in parts:
+                    part = int(part)
+                    if part > part_mask:
+                        raise AddrPartTooBigError(part)
+                    if part < 0:
+                        raise AddrPartTooSmallError(part)
+                    net_addr = (net_addr << bits) | part
+                mask = int(mask_str)
+                if mask > SubnetV4.MAX_BITS:
+                    raise MaskTooBigError(mask)
+                if mask < 0:
+                    raise MaskTooSmallError(mask)
+            except (TypeError, ValueError) as e:
+                errors[row] = e
+                net_addr = 0
+                mask = 0
+            net_addrs.append(net_addr)
+            masks.append(mask)
+        return (net_addrs, masks, errors)
+
+    def formatMany(net_addrs, masks) -> [str]:
+        '''convert packed arrays of network addresses and masks into strings'''
+        if len(net_addrs) != len(masks):
+            raise ValueError('\'net_addrs\' and \'masks\' must be the same length, not '
+                             + str(len(net_addrs)) + ' and ' + str(len(masks)))
+        part_mask = SubnetV4.PART_MASK
+        shifts = SubnetV4.PART_SHIFTS
+        parts = [str(i) for i in range(part_mask + 1)]
+        sep = SubnetV4.ADDR_SEP
+        mask_sep = SubnetV4.MASK_SEP
+        return [sep.join([parts[(net_addr >> shift) & part_mask] for shift in shifts]) + mask_sep + str(mask)
+                for net_addr, mask in zip(net_addrs, masks)]
+
+    def _ranges(subnets):
+        '''the unsorted (start, end) ranges of addresses covered by some subnets,
+        with each end being the first address after the range'''
+        if not isinstance(subnets, SubnetV4Array):
+            subnets = SubnetV4Array.fromSubnets(subnets)
+        sizes = SubnetV4.SIZES
+        return zip(subnets.net_addrs, [net_addr + sizes[mask] for net_addr, mask in zip(subnets.net_addrs, subnets.masks)])
+
+    def summarize(subnets):
+        '''merge overlapping and adjacent subnets into the fewest aligned subnets covering exactly the same addresses'''
+        res = SubnetV4Array()
+        for start, end in _mergeRanges(SubnetV4._ranges(subnets)):
+            for net_addr, mask in _blocks(start, end, SubnetV4.MAX_BITS):
+                res.net_addrs.append(net_addr)
+                res.masks.append(mask)
+        return res
+
+    def exclude(root, subnets):
+        '''the fewest aligned subnets covering every address of a root network not used by any of some subnets'''
+        if not isinstance(root, SubnetV4):
+            raise TypeError('\'root\' must be a SubnetV4, not a ' + str(type(root)))
+        res = SubnetV4Array()
+        for net_addr, mask in _freeBlocks(root.networkAddr(), root.networkAddr() + root.totalAddr(),
+                                          SubnetV4._ranges(subnets), SubnetV4.MAX_BITS):
+            res.net_addrs.append(net_addr)
+            res.masks.append(mask)
+        return res
 
     def broadcastAddr(self) -> int:
         '''the last address in this sub network (aka broadcast address)'''
@@ -258,7 +401,7 @@ class SubnetV4():
         
     def totalAddr(self) -> int:
         '''the total number of addresses that can be used in this subnetwork'''
-        return 2 ** (SubnetV4.MAX_BITS - self.mask)
+        return SubnetV4.SIZES[self.mask]
 
     def useableAddr(self) -> int:
         '''the number of addresses that can be used for hosts in this subnetwork'''
@@ -270,20 +413,373 @@ class SubnetV4():
 
     def addrMask(self) -> tuple:
         '''the mask using IPv4 notation'''
-        return SubnetV4.intToAddr(int('0b' + '1' * self.mask + '0' * (SubnetV4.MAX_BITS - self.mask), 2))
-
-assert SubnetV4() == SubnetV4()
-assert repr(SubnetV4(255,24)) == 'SubnetV4(255,24)'
-assert SubnetV4.strToAddr('255.255.255.255') == (255,255,255,255)
-assert SubnetV4.addrToInt((255,255,255,0)) == int('0b' + '1' * 24 + '0' * 8, 2)
-assert SubnetV4.intToAddr(int('0b' + '1' * 24 + '0' * 8, 2)) == (255,255,255,0)
-assert SubnetV4.strToSubnetV4('255.255.255.0/24') == SubnetV4(int('0b'+'1'*24+'0'*8,2),24)
-assert str(SubnetV4(255,24)) == '0.0.0.255/24'
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).totalAddr() == 2 ** (SubnetV4.MAX_BITS - 24)
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).useableAddr() == 2 ** (SubnetV4.MAX_BITS - 24) - 2
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).broadcastAddr() == int('0b'+'1'*32,2)
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).networkAddr() == int('0b'+'1'*24+'0'*8,2)
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).firstAddr() == int('0b'+'1'*24+'0'*7+'1',2)
-assert SubnetV4(int('0b'+'1'*24+'0'*8,2),24).lastAddr() == int('0b'+'1'*31+'0',2)
-assert SubnetV4.strToSubnetV4('123.244.0.1/16').slashMask() == 16
-assert SubnetV4.strToSubnetV4('123.244.0.1/16').addrMask() == (255,255,0,0)
+        return SubnetV4.intToAddr(SubnetV4.ADDR_MASKS[self.mask])
+
+class SubnetV4Array():
+    '''a compact collection of SubnetV4s backed by packed arrays of network addresses and masks'''
+    __slots__ = ('net_addrs', 'masks')
+
+    def __init__(self, net_addrs = (), masks = ()):
+        # the values are checked before they are packed, as packing fails on those out of range with an OverflowError
+        if not isinstance(net_addrs, array):
+            net_addrs = list(net_addrs)
+        if not isinstance(masks, array):
+            masks = list(masks)
+        if len(net_addrs) != len(masks):
+            raise ValueError('\'net_addrs\' and \'masks\' must be the same length, not '
+                             + str(len(net_addrs)) + ' and ' + str(len(masks)))
+        if len(net_addrs) > 0:
+            if max(net_addrs) >= SubnetV4.ADDR_LIMIT:
+                raise AddrTooBigError(max(net_addrs))
+            if min(net_addrs) < 0:
+                raise AddrTooSmallError(min(net_addrs))
+            if max(masks) > SubnetV4.MAX_BITS:
+                raise MaskTooBigError(max(masks))
+            if min(masks) < 0:
+                raise MaskTooSmallError(min(masks))
+        self.net_addrs = array(ADDR_TYPECODE, net_addrs)
+        self.masks = array(MASK_TYPECODE, masks)
+        return
+
+    def fromSubnets(subnets):
+        '''pack an iterable of SubnetV4s into a SubnetV4Array'''
+        res = SubnetV4Array()
+        for subnet in subnets:
+            res.append(subnet)
+        return res
+
+    def append(self, subnet: SubnetV4):
+        '''add a SubnetV4 to the end of this collection'''
+        if not isinstance(subnet, SubnetV4):
+            raise TypeError('\'subnet\' must be a SubnetV4, not a ' + str(type(subnet)))
+        self.net_addrs.append(subnet.net_addr)
+        self.masks.append(subnet.mask)
+
+    def __len__(self) -> int:
+        return len(self.net_addrs)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            res = SubnetV4Array()
+            res.net_addrs = self.net_addrs[i]
+            res.masks = self.masks[i]
+            return res
+        return SubnetV4._unchecked(self.net_addrs[i], self.masks[i])
+
+    def __iter__(self):
+        for net_addr, mask in zip(self.net_addrs, self.masks):
+            yield SubnetV4._unchecked(net_addr, mask)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SubnetV4Array):
+            return self.net_addrs == other.net_addrs and self.masks == other.masks
+        elif isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        else:
+            return False
+
+    def __repr__(self) -> str:
+        return 'SubnetV4Array(' + repr(self.net_addrs.tolist()) + ',' + repr(self.masks.tolist()) + ')'
+
+    def broadcastAddr(self) -> array:
+        '''the last address in every sub network, which like SubnetV4.broadcastAddr
+        can be past the 32 bit limit for a network address with host bits set'''
+        sizes = SubnetV4.SIZES
+        return array(COUNT_TYPECODE, [net_addr + sizes[mask] - 1 for net_addr, mask in zip(self.net_addrs, self.masks)])
+
+    def totalAddr(self) -> array:
+        '''the total number of addresses in every sub network'''
+        return array(COUNT_TYPECODE, map(SubnetV4.SIZES.__getitem__, self.masks))
+
+    def useableAddr(self) -> array:
+        '''the number of addresses that can be used for hosts in every sub network'''
+        sizes = SubnetV4.SIZES
+        return array(COUNT_TYPECODE, [sizes[mask] - 2 for mask in self.masks])
+
+    def addrMask(self) -> array:
+        '''the mask of every sub network as an integer address'''
+        return array(ADDR_TYPECODE, map(SubnetV4.ADDR_MASKS.__getitem__, self.masks))
+
+class SubnetRangeV4():
+    '''a run of equally sized subnets placed back to back, described by the first network address,
+    the shared slash notation mask and the number of subnets'''
+    SUBNET = SubnetV4
+    __slots__ = ('net_addr', 'mask', 'count')
+
+    def __init__(self, net_addr: int, mask: int, count: int):
+        if not isinstance(net_addr, int):
+            raise TypeError('\'net_addr\' must be an integer, not a ' + str(type(net_addr)))
+        if not isinstance(mask, int):
+            raise TypeError('\'mask\' must be an integer, not a ' + str(type(mask)))
+        if not isinstance(count, int):
+            raise TypeError('\'count\' must be an integer, not a ' + str(type(count)))
+        if net_addr < 0:
+            raise AddrTooSmallError(net_addr)
+        subnet_type = self.SUBNET
+        if mask > subnet_type.MAX_BITS:
+            raise MaskTooBigError(mask, subnet_type)
+        if mask < 0:
+            raise MaskTooSmallError(mask)
+        if count < 0:
+            raise ValueError('\'count\' must be 0 or greater, not ' + str(count))
+        if net_addr + count * subnet_type.SIZES[mask] > subnet_type.ADDR_LIMIT:
+            raise AddrTooBigError(net_addr + count * subnet_type.SIZES[mask] - 1, subnet_type)
+        self.net_addr = net_addr
+        self.mask = mask
+        self.count = count
+        return
+
+    def __eq__(self, other) -> bool:
+        if type(other) is type(self):
+            return self.net_addr == other.net_addr and self.mask == other.mask and self.count == other.count
+        else:
+            return False
+
+    def __repr__(self) -> str:
+        return type(self).__name__ + '(' + repr(self.net_addr) + ',' + repr(self.mask) + ',' + repr(self.count) + ')'
+
+    def __str__(self) -> str:
+        return str(self.count) + ' x /' + str(self.mask) + ' from ' + str(self.SUBNET._unchecked(self.net_addr, self.mask))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, i: int):
+        if not isinstance(i, int):
+            raise TypeError('\'i\' must be an integer, not a ' + str(type(i)))
+        if i < 0:
+            i += self.count
+        if i < 0 or i >= self.count:
+            raise IndexError('\'i\' must index one of the ' + str(self.count) + ' subnets, not ' + str(i))
+        return self.SUBNET._unchecked(self.net_addr + i * self.SUBNET.SIZES[self.mask], self.mask)
+
+    def __iter__(self):
+        unchecked = self.SUBNET._unchecked
+        mask = self.mask
+        for net_addr in range(self.net_addr, self.endAddr(), self.SUBNET.SIZES[mask]):
+            yield unchecked(net_addr, mask)
+
+    def endAddr(self) -> int:
+        '''the first address after the last subnet in this range'''
+        return self.net_addr + self.count * self.SUBNET.SIZES[self.mask]
+
+    def totalAddr(self) -> int:
+        '''the total number of addresses in every subnet of this range'''
+        return self.count * self.SUBNET.SIZES[self.mask]
+
+    def toArray(self) -> SubnetV4Array:
+        '''expand this range into a SubnetV4Array'''
+        res = SubnetV4Array()
+        res.net_addrs.extend(range(self.net_addr, self.endAddr(), SubnetV4.SIZES[self.mask]))
+        res.masks.extend(array(MASK_TYPECODE, [self.mask]) * self.count)
+        return res
+
+class SubnetV6():
+    '''a representation of a subnetwork using IPv6'''
+    VERSION = 'IPv6'
+    MAX_BITS = 128
+    ADDR_DIVISIONS = 8
+    ADDR_SEP = ':'
+    ZEROS_SEP = '::'
+    MASK_SEP = '/'
+    PART_BITS = MAX_BITS // ADDR_DIVISIONS
+    PART_MASK = 2 ** PART_BITS - 1
+    PART_DIGITS = PART_BITS // 4
+    HEX_DIGITS = frozenset(string.hexdigits)
+    ADDR_BYTES = MAX_BITS // 8
+    ADDR_LIMIT = 2 ** MAX_BITS
+    SIZES = tuple(map((2).__pow__, range(MAX_BITS, -1, -1)))
+    ADDR_MASKS = tuple(map(ADDR_LIMIT.__sub__, SIZES))
+    PARTS = struct.Struct('>' + str(ADDR_DIVISIONS) + 'H')
+    __slots__ = ('net_addr', 'mask')
+
+    def __init__(self, net_addr: int = 0, mask: int = 128):
+        if not isinstance(net_addr, int):
+            raise TypeError('\'net_addr\' must be an integer, not a ' + str(type(net_addr)))
+        if not isinstance(mask, int):
+            raise TypeError('\'mask\' must be an integer, not a ' + str(type(mask)))
+        if net_addr >= SubnetV6.ADDR_LIMIT:
+            raise AddrTooBigError(net_addr, SubnetV6)
+        if net_addr < 0:
+            raise AddrTooSmallError(net_addr)
+        if mask > SubnetV6.MAX_BITS:
+            raise MaskTooBigError(mask, SubnetV6)
+        if mask < 0:
+            raise MaskTooSmallError(mask)
+        self.net_addr = net_addr
+        self.mask = mask
+        return
+
+    def _unchecked(net_addr: int, mask: int):
+        '''create a SubnetV6 without validating the arguments, for trusted internal callers only'''
+        subnet = object.__new__(SubnetV6)
+        subnet.net_addr = net_addr
+        subnet.mask = mask
+        return subnet
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, SubnetV6):
+            return self.net_addr == other.net_addr and self.mask == other.mask
+        else:
+            return False
+
+    def __hash__(self) -> int:
+        return hash((SubnetV6, self.net_addr, self.mask))
+
+    def __repr__(self) -> str:
+        return 'SubnetV6(' + repr(self.net_addr) + ',' + repr(self.mask) + ')'
+
+    def __str__(self) -> str:
+        return SubnetV6.addrToStr(self.net_addr) + SubnetV6.MASK_SEP + str(self.mask)
+
+    def strToSubnetV6(x: str):
+        '''convert a string into a SubnetV6'''
+        if not isinstance(x, str):
+            raise TypeError('\'x\' must be a string, not a ' + str(type(x)))
+        if x.count(SubnetV6.MASK_SEP) != 1:
+            raise MaskSepCountError(x.count(SubnetV6.MASK_SEP), 1, SubnetV6)
+        addr, sep, mask = x.partition(SubnetV6.MASK_SEP)
+        return SubnetV6(SubnetV6.addrToInt(SubnetV6.strToAddr(addr)), int(mask))
+
+    def strToAddr(x: str) -> tuple:
+        '''convert a string of hexadecimal parts, with the longest run of zero parts optionally compressed,
+        into a suitable representation of an address'''
+        if not isinstance(x, str):
+            raise TypeError('\'x\' must be a string, not a ' + str(type(x)))
+        count = x.count(SubnetV6.ZEROS_SEP)
+        if count > 1:
+            raise ValueError('There must be at most 1 occurance of the compressed zeros separator ('
+                             + SubnetV6.ZEROS_SEP + ') but ' + str(count) + ' were found!')
+        if count == 1:
+            head, sep, tail = x.partition(SubnetV6.ZEROS_SEP)
+            head = head.split(SubnetV6.ADDR_SEP) if head else []
+            tail = tail.split(SubnetV6.ADDR_SEP) if tail else []
+            if len(head) + len(tail) >= SubnetV6.ADDR_DIVISIONS:
+                raise AddrSepCountError(x.count(SubnetV6.ADDR_SEP), SubnetV6.ADDR_DIVISIONS - 1, SubnetV6)
+            addr_parts = head + ['0'] * (SubnetV6.ADDR_DIVISIONS - len(head) - len(tail)) + tail
+        else:
+            if x.count(SubnetV6.ADDR_SEP) != SubnetV6.ADDR_DIVISIONS - 1:
+                raise AddrSepCountError(x.count(SubnetV6.ADDR_SEP), SubnetV6.ADDR_DIVISIONS - 1, SubnetV6)
+            addr_parts = x.split(SubnetV6.ADDR_SEP)
+        addr = []
+        for part_str in addr_parts:
+            # int() alone would also accept signs, underscores, whitespace and a 0x prefix
+            if not part_str or not SubnetV6.HEX_DIGITS.issuperset(part_str):
+                raise ValueError('Every part of an IPv6 address must be 1 to ' + str(SubnetV6.PART_DIGITS)
+                                 + ' hexadecimal digits, not ' + repr(part_str))
+            part = int(part_str, 16)
+            if part > SubnetV6.PART_MASK:
+                raise AddrPartTooBigError(part, SubnetV6)
+            if len(part_str) > SubnetV6.PART_DIGITS:
+                raise ValueError('Every part of an IPv6 address must be 1 to ' + str(SubnetV6.PART_DIGITS)
+                                 + ' hexadecimal digits, not ' + repr(part_str))
+            addr.append(part)
+        return tuple(addr)
+
+    def intToAddr(x: int) -> tuple:
+        '''convert an integer into a suitable representation of an address'''
+        if not isinstance(x, int):
+            raise TypeError('\'x\' must be an integer, not a ' + str(type(x)))
+        if x < 0:
+            raise AddrTooSmallError(x)
+        if x >= SubnetV6.ADDR_LIMIT:
+            raise AddrTooBigError(x, SubnetV6)
+        return SubnetV6.PARTS.unpack(x.to_bytes(SubnetV6.ADDR_BYTES, 'big'))
+
+    def addrToInt(x: tuple) -> int:
+        '''convert a tuple address to an integer'''
+        if not isinstance(x, tuple):
+            raise TypeError('\'x\' must be a tuple, not a ' + str(type(x)))
+        if len(x) != SubnetV6.ADDR_DIVISIONS:
+            raise ValueError('\'x\' must be ' + str(SubnetV6.ADDR_DIVISIONS) + ' long, not ' + str(len(x)))
+        try:
+            return int.from_bytes(SubnetV6.PARTS.pack(*x), 'big')
+        except struct.error:
+            for part in x:
+                if not isinstance(part, int):
+                    raise TypeError('every element of \'x\' must be an integer, not a ' + str(type(part)))
+                if part > SubnetV6.PART_MASK:
+                    raise AddrPartTooBigError(part, SubnetV6)
+                if part < 0:
+                    raise AddrPartTooSmallError(part, SubnetV6)
+            raise
+
+    def addrToStr(x: int) -> str:
+        '''convert an integer into the canonical text of an address,
+        compressing the first of the longest runs of at least 2 zero parts'''
+        addr_parts = SubnetV6.intToAddr(x)
+        best_start = 0
+        best_len = 1
+        start = 0
+        for i, part in enumerate(addr_parts + (1,)):
+            if part != 0:
+                if i - start > best_len:
+                    best_start = start
+                    best_len = i - start
+                start = i + 1
+        hex_parts = [format(part, 'x') for part in addr_parts]
+        if best_len < 2:
+            return SubnetV6.ADDR_SEP.join(hex_parts)
+        return (SubnetV6.ADDR_SEP.join(hex_parts[:best_start]) + SubnetV6.ZEROS_SEP
+                + SubnetV6.ADDR_SEP.join(hex_parts[best_start + best_len:]))
+
+    def _ranges(subnets):
+        '''the unsorted (start, end) ranges of addresses covered by some subnets,
+        with each end being the first address after the range'''
+        sizes = SubnetV6.SIZES
+        return [(subnet.net_addr, subnet.net_addr + sizes[subnet.mask]) for subnet in subnets]
+
+    def summarize(subnets) -> list:
+        '''merge overlapping and adjacent subnets into the fewest aligned subnets covering exactly the same addresses'''
+        return [SubnetV6._unchecked(net_addr, mask)
+                for start, end in _mergeRanges(SubnetV6._ranges(subnets))
+                for net_addr, mask in _blocks(start, end, SubnetV6.MAX_BITS)]
+
+    def exclude(root, subnets) -> list:
+        '''the fewest aligned subnets covering every address of a root network not used by any of some subnets'''
+        if not isinstance(root, SubnetV6):
+            raise TypeError('\'root\' must be a SubnetV6, not a ' + str(type(root)))
+        return [SubnetV6._unchecked(net_addr, mask)
+                for net_addr, mask in _freeBlocks(root.networkAddr(), root.networkAddr() + root.totalAddr(),
+                                                  SubnetV6._ranges(subnets), SubnetV6.MAX_BITS)]
+
+    def broadcastAddr(self) -> int:
+        '''the last address in this sub network'''
+        return self.net_addr + SubnetV6.SIZES[self.mask] - 1
+
+    def networkAddr(self) -> int:
+        '''the first address in this sub network (aka network address)'''
+        return self.net_addr
+
+    def firstAddr(self) -> int:
+        '''the first usable address in this sub network'''
+        return self.net_addr + 1
+
+    def lastAddr(self) -> int:
+        '''the last usable address in this sub network'''
+        return self.net_addr + SubnetV6.SIZES[self.mask] - 2
+
+    def totalAddr(self) -> int:
+        '''the total number of addresses that can be used in this subnetwork'''
+        return SubnetV6.SIZES[self.mask]
+
+    def useableAddr(self) -> int:
+        '''the number of addresses that can be used for hosts in this subnetwork'''
+        return SubnetV6.SIZES[self.mask] - 2
+
+    def slashMask(self) -> int:
+        '''the number of bits used for the network part of the address'''
+        return self.mask
+
+    def addrMask(self) -> tuple:
+        '''the mask using IPv6 notation'''
+        return SubnetV6.intToAddr(SubnetV6.ADDR_MASKS[self.mask])
+
+class SubnetRangeV6(SubnetRangeV4):
+    '''a run of equally sized SubnetV6s placed back to back'''
+    SUBNET = SubnetV6
+    __slots__ = ()
+
+    def toArray(self) -> list:
+        '''expand this range into a list, as IPv6 addresses do not fit in a packed array'''
+        return list(self)
@@ -0,0 +1,130 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from subnet import ADDR_TYPECODE, COUNT_TYPECODE, SubnetV4, SubnetV4Array
+
+class SubnetIndexV4():
+    '''an index of SubnetV4s for containment, overlap and longest prefix match lookups'''
+    STRIDE = 16
+
+    def __init__(self, subnets = ()):
+        if isinstance(subnets, SubnetV4Array):
+            subnets = subnets[:]
+        else:
+            subnets = SubnetV4Array.fromSubnets(subnets)
+        self.subnets = subnets
+        # the position of every prefix (the network address with its host bits cleared) for each slash notation mask
+        self.tables = [{} for mask in range(SubnetV4.MAX_BITS + 1)]
+        for i, (net_addr, mask) in enumerate(zip(subnets.net_addrs, subnets.masks)):
+            self.tables[mask].setdefault(net_addr & SubnetV4.ADDR_MASKS[mask], i)
+        self.masks = [mask for mask in range(SubnetV4.MAX_BITS, -1, -1) if self.tables[mask]]
+        # the addresses are split into buckets by their first STRIDE bits;
+        # every bucket directly stores its longest prefix match among the prefixes no longer than the stride
+        # and lists the longer masks that have prefixes inside it, so a lookup only tries masks that can match
+        shift = SubnetV4.MAX_BITS - SubnetIndexV4.STRIDE
+        self.shift = shift
+        self.short = array(COUNT_TYPECODE, [-1]) * (SubnetV4.ADDR_LIMIT >> shift)
+        for mask in reversed(self.masks):
+            if mask > SubnetIndexV4.STRIDE:
+                break
+            width = SubnetV4.SIZES[mask] >> shift
+            for prefix, i in self.tables[mask].items():
+                start = prefix >> shift
+                self.short[start:start + width] = array(COUNT_TYPECODE, [i]) * width
+        self.buckets = {}
+        for mask in self.masks:
+            if mask <= SubnetIndexV4.STRIDE:
+                break
+            for prefix in self.tables[mask]:
+                masks = self.buckets.setdefault(prefix >> shift, [])
+                if not masks or masks[-1] != mask:
+                    masks.append(mask)
+        # every prefix sorted by address for range queries
+        prefixes = sorted((prefix, i) for mask in self.masks for prefix, i in self.tables[mask].items())
+        self.starts = array(ADDR_TYPECODE, [prefix for prefix, i in prefixes])
+        self.order = array(COUNT_TYPECODE, [i for prefix, i in prefixes])
+        return
+
+    def __len__(self) -> int:
+        return len(self.subnets)
+
+    def __repr__(self) -> str:
+        return 'SubnetIndexV4(' + repr(self.subnets) + ')'
+
+    def lookupIndex(self, addr: int) -> int:
+        '''the position of the longest prefix subnet containing an integer address, or -1 if there is none'''
+        if not isinstance(addr, int):
+            raise TypeError('\'addr\' must be an integer, not a ' + str(type(addr)))
+        if addr < 0 or addr >= SubnetV4.ADDR_LIMIT:
+            raise ValueError('\'addr\' must fit in ' + str(SubnetV4.MAX_BITS) + ' bits, not ' + str(addr))
+        bucket = addr >> self.shift
+        masks = self.buckets.get(bucket)
+        if masks is not None:
+            tables = self.tables
+            addr_masks = SubnetV4.ADDR_MASKS
+            for mask in masks:
+                i = tables[mask].get(addr & addr_masks[mask])
+                if i is not None:
+                    return i
+        return self.short[bucket]
+
+    def lookup(self, addr: int) -> SubnetV4:
+        '''the longest prefix subnet containing an integer address, or None if there is none'''
+        i = self.lookupIndex(addr)
+        if i < 0:
+            return None
+        return self.subnets[i]
+
+    def __contains__(self, addr: int) -> bool:
+        return self.lookupIndex(addr) >= 0
+
+    def lookupMany(self, addrs) -> array:
+        '''the position of the longest prefix subnet containing every integer address, or -1 where there is none'''
+        if not isinstance(addrs, array):
+            addrs = list(addrs)
+            if len(addrs) > 0:
+                for addr in (min(addrs), max(addrs)):
+                    if addr < 0 or addr >= SubnetV4.ADDR_LIMIT:
+                        raise ValueError('\'addr\' must fit in ' + str(SubnetV4.MAX_BITS) + ' bits, not ' + str(addr))
+            addrs = array(ADDR_TYPECODE, addrs)
+        shift = self.shift
+        # resolve every address against the short prefixes in one pass, then refine only those in buckets with longer ones
+        res = array(COUNT_TYPECODE, map(self.short.__getitem__, [addr >> shift for addr in addrs]))
+        buckets = self.buckets
+        if not buckets:
+            return res
+        tables = self.tables
+        addr_masks = SubnetV4.ADDR_MASKS
+        get_masks = buckets.get
+        for i, addr in enumerate(addrs):
+            masks = get_masks(addr >> shift)
+            if masks is not None:
+                for mask in masks:
+                    found = tables[mask].get(addr & addr_masks[mask])
+                    if found is not None:
+                        res[i] = found
+                        break
+        return res
+
+    def overlapping(self, subnet: SubnetV4) -> [int]:
+        '''the positions of every indexed subnet sharing any address with a subnet'''
+        if not isinstance(subnet, SubnetV4):
+            raise TypeError('\'subnet\' must be a SubnetV4, not a ' + str(type(subnet)))
+        prefix = subnet.net_addr & SubnetV4.ADDR_MASKS[subnet.mask]
+        last = prefix + SubnetV4.SIZES[subnet.mask] - 1
+        # indexed subnets starting inside the subnet, then those containing it from further out
+        res = list(self.order[bisect_left(self.starts, prefix):bisect_right(self.starts, last)])
+        for mask in self.masks:
+            covering = prefix & SubnetV4.ADDR_MASKS[mask]
+            if mask < subnet.mask and covering < prefix:
+                i = self.tables[mask].get(covering)
+                if i is not None:
+                    res.append(i)
+        return res
+
+    def overlaps(self, subnets) -> bool:
+        '''whether any of the subnets shares an address with any indexed subnet'''
+        for subnet in subnets:
+            if self.overlapping(subnet):
+                return True
+        return False
@@ -1,76 +1,253 @@
-from subnet import SubnetV4
+from array import array
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+
+from subnet import MASK_TYPECODE, SubnetRangeV4, SubnetRangeV6, SubnetV4, SubnetV4Array, SubnetV6
 
 class ImpossibleSubnetError(Exception):
     '''impossible to fulfil subnetting requirements'''
     def __init__(self, root: SubnetV4, hosts: [int]):
-        if not isinstance(root, SubnetV4):
-            raise TypeError('\'root\' must be a SubnetV4, not a ' + str(type(root)))
-        if not isinstance(hosts, list):
-            raise TypeError('\'hosts\' must be a list, not a ' + str(type(hosts)))
-        if len(hosts) < 1:
-            raise IndexError('\'hosts\' must contain at least 1 item, not ' + str(len(hosts)))
-        for host in hosts:
-            if not isinstance(host, int):
-                raise TypeError('every element in \'hosts\' must be an integer, not a ' + str(type(host)))
-            if host < 1:
-                raise ValueError('every element in \'hosts\' must be greater than 0, not ' + str(host))
+        if not isinstance(root, (SubnetV4, SubnetV6)):
+            raise TypeError('\'root\' must be a SubnetV4 or a SubnetV6, not a ' + str(type(root)))
+        runs = SubnetterV4.hostRuns(hosts)
         self.root = root
         self.hosts = hosts
-        hosts_str = ''
-        for host in hosts:
-            hosts_str += str(host) + ', '
-        hosts_str = hosts_str[0:-2]
+        if runs is None:
+            hosts_str = ', '.join(map(str, hosts))
+        else:
+            hosts_str = ', '.join(str(host) + ' x ' + str(count) for host, count in runs)
         self.mes = ('Cannot fit all sub-networks with required network address spaces ('+hosts_str+') into allocated address space ('+str(root)+')!')
 
     def __str__(self) -> str:
         return self.mes
 
+class PlanCache():
+    '''a least recently used cache of subnetting plans, bounded both in plans and in the subnets they hold in total'''
+
+    def __init__(self, maxsize: int = 256, maxsubnets: int = 2 ** 20):
+        if not isinstance(maxsize, int):
+            raise TypeError('\'maxsize\' must be an integer, not a ' + str(type(maxsize)))
+        if maxsize < 0:
+            raise ValueError('\'maxsize\' must be 0 or greater, not ' + str(maxsize))
+        if not isinstance(maxsubnets, int):
+            raise TypeError('\'maxsubnets\' must be an integer, not a ' + str(type(maxsubnets)))
+        if maxsubnets < 0:
+            raise ValueError('\'maxsubnets\' must be 0 or greater, not ' + str(maxsubnets))
+        self.maxsize = maxsize
+        self.maxsubnets = maxsubnets
+        self.plans = OrderedDict()
+        self.subnets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        return
+
+    def __len__(self) -> int:
+        return len(self.plans)
+
+    def __repr__(self) -> str:
+        return ('PlanCache(' + repr(self.maxsize) + ', ' + repr(self.maxsubnets) + ') with ' + str(len(self)) + ' plans of '
+                + str(self.subnets) + ' subnets, ' + str(self.hits) + ' hits, '
+                + str(self.misses) + ' misses and ' + str(self.evictions) + ' evictions')
+
+    def get(self, key: tuple):
+        '''the cached plan for a key, or None if there is no such plan'''
+        plan = self.plans.get(key)
+        if plan is None:
+            self.misses += 1
+            return None
+        self.plans.move_to_end(key)
+        self.hits += 1
+        return plan
+
+    def put(self, key: tuple, plan):
+        '''cache a plan, evicting the least recently used plans beyond the size limits,
+        unless the plan alone holds more subnets than the limit'''
+        size = len(plan[0])
+        if size > self.maxsubnets:
+            return
+        old = self.plans.pop(key, None)
+        if old is not None:
+            self.subnets -= len(old[0])
+        self.plans[key] = plan
+        self.subnets += size
+        while len(self.plans) > self.maxsize or self.subnets > self.maxsubnets:
+            self.subnets -= len(self.plans.popitem(last=False)[1][0])
+            self.evictions += 1
+
+    def clear(self):
+        '''remove every cached plan and reset the counters'''
+        self.plans.clear()
+        self.subnets = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
 class SubnetterV4():
     '''a calculator for subnetting'''
-    
-    def __init__(self, root: SubnetV4 = SubnetV4(), hosts: [int] = [1]):
-        if not isinstance(root, SubnetV4):
-            raise TypeError('\'root\' must be a SubnetV4, not a ' + str(type(root)))
-        if not isinstance(hosts, list):
-            raise TypeError('\'hosts\' must be a list, not a ' + str(type(hosts)))
-        if len(hosts) < 1:
-            raise IndexError('\'hosts\' must contain at least 1 item, not ' + str(len(hosts)))
-        for host in hosts:
-            if not isinstance(host, int):
-                raise TypeError('every element in \'hosts\' must be an integer, not a ' + str(type(host)))
-            if host < 1:
-                raise ValueError('every element in \'hosts\' must be greater than 0, not ' + str(host))
+    SUBNET = SubnetV4
+    RANGE = SubnetRangeV4
+    CACHE = PlanCache()
+    PLAN_CHUNK = 512
+
+    def __init__(self, root: SubnetV4 = None, hosts: [int] = [1]):
+        if root is None:
+            root = self.SUBNET()
+        if not isinstance(root, self.SUBNET):
+            raise TypeError('\'root\' must be a ' + self.SUBNET.__name__ + ', not a ' + str(type(root)))
+        self.runs = SubnetterV4.hostRuns(hosts)
         self.root = root
         self.hosts = hosts
         return
 
+    def hostRuns(hosts) -> [(int, int)]:
+        '''validate the host quantities for each sub network, given either as a list with one per sub network
+        or counted as a {hosts: count} dictionary or a list of (hosts, count) tuples,
+        returning the counted (hosts, count) runs, or None for a plain list'''
+        if isinstance(hosts, dict):
+            runs = list(hosts.items())
+        elif isinstance(hosts, list):
+            if len(hosts) < 1:
+                raise IndexError('\'hosts\' must contain at least 1 item, not ' + str(len(hosts)))
+            if not isinstance(hosts[0], tuple):
+                for host in hosts:
+                    if not isinstance(host, int):
+                        raise TypeError('every element in \'hosts\' must be an integer, not a ' + str(type(host)))
+                    if host < 1:
+                        raise ValueError('every element in \'hosts\' must be greater than 0, not ' + str(host))
+                return None
+            runs = hosts
+        else:
+            raise TypeError('\'hosts\' must be a list or a dictionary, not a ' + str(type(hosts)))
+        if len(runs) < 1:
+            raise IndexError('\'hosts\' must contain at least 1 item, not ' + str(len(runs)))
+        for run in runs:
+            if not isinstance(run, tuple) or len(run) != 2:
+                raise TypeError('every counted element in \'hosts\' must be a (hosts, count) tuple, not ' + repr(run))
+            host, count = run
+            if not isinstance(host, int):
+                raise TypeError('every host quantity in \'hosts\' must be an integer, not a ' + str(type(host)))
+            if host < 1:
+                raise ValueError('every host quantity in \'hosts\' must be greater than 0, not ' + str(host))
+            if not isinstance(count, int):
+                raise TypeError('every count in \'hosts\' must be an integer, not a ' + str(type(count)))
+            if count < 1:
+                raise ValueError('every count in \'hosts\' must be greater than 0, not ' + str(count))
+        return runs
+
+    def hostCounts(self) -> Counter:
+        '''the number of sub networks requiring each host quantity'''
+        if self.runs is None:
+            return Counter(self.hosts)
+        counts = Counter()
+        for host, count in self.runs:
+            counts[host] += count
+        return counts
+
     def __eq__(self, other) -> bool:
         if isinstance(other, SubnetterV4):
-            return self.root == other.root and self.hosts.sort() == other.hosts.sort()
+            return self.root == other.root and self.hostCounts() == other.hostCounts()
         else:
             return False
 
     def __repr__(self) -> str:
-        return 'SubnetterV4(' + repr(self.root) + ',' + repr(self.hosts) + ')'
+        return type(self).__name__ + '(' + repr(self.root) + ',' + repr(self.hosts) + ')'
 
-    def calcSubnets(self) -> [SubnetV4]:
+    def blockCounts(self) -> [int]:
+        '''count the subnets needing each number of host bits in a single pass over the hosts,
+        raising an ImpossibleSubnetError if their blocks cannot all fit into the root network'''
+        max_bits = self.SUBNET.MAX_BITS
+        counts = [0] * (max_bits + 1)
+        # hosts are validated positive integers so (host + 1).bit_length() is requiredBits(host + 2) without the checks
+        if self.runs is None:
+            for host in self.hosts:
+                bit = (host + 1).bit_length()
+                if bit > max_bits:
+                    raise ImpossibleSubnetError(self.root, self.hosts)
+                counts[bit] += 1
+        else:
+            for host, count in self.runs:
+                bit = (host + 1).bit_length()
+                if bit > max_bits:
+                    raise ImpossibleSubnetError(self.root, self.hosts)
+                counts[bit] += count
+        if sum(count << bit for bit, count in enumerate(counts)) > self.root.totalAddr():
+            raise ImpossibleSubnetError(self.root, self.hosts)
+        return counts
+
+    def isFeasible(self) -> bool:
+        '''whether the blocks for every subnet fit into the root network'''
+        try:
+            self.blockCounts()
+        except ImpossibleSubnetError:
+            return False
+        return True
+
+    def calcPlan(self) -> (SubnetV4Array, int):
+        '''calculate the subnets and the number of remaining network addresses together'''
+        subnets, remaining = self._calcPlan()
+        return (subnets[:], remaining)
+
+    def _calcPlan(self) -> (SubnetV4Array, int):
+        '''calculate the subnets and the number of remaining network addresses together,
+        sharing the result through the plan cache, so it must not be changed'''
+        # the plan only depends on how many blocks of each size are needed, so that is the canonical key
+        counts = self.blockCounts()
+        key = (self.root, tuple(counts))
+        plan = self.CACHE.get(key)
+        if plan is not None:
+            return plan
+        start = self.root.networkAddr()
+        addr = start
+        subnets = SubnetV4Array()
+        for bit in range(SubnetV4.MAX_BITS, -1, -1):
+            count = counts[bit]
+            if count == 0:
+                continue
+            size = 1 << bit
+            subnets.net_addrs.extend(range(addr, addr + count * size, size))
+            subnets.masks.extend(array(MASK_TYPECODE, [SubnetV4.MAX_BITS - bit]) * count)
+            addr += count * size
+        plan = (subnets, self.root.totalAddr() - (addr - start))
+        self.CACHE.put(key, plan)
+        return plan
+
+    def _placeRanges(self, counts: [int]) -> list:
+        '''place the blocks counted for each number of host bits back to back from the root network address,
+        largest first, as one range per block size'''
+        max_bits = self.SUBNET.MAX_BITS
+        addr = self.root.networkAddr()
+        ranges = []
+        for bit in range(max_bits, -1, -1):
+            if counts[bit] > 0:
+                ranges.append(self.RANGE(addr, max_bits - bit, counts[bit]))
+                addr += counts[bit] << bit
+        return ranges
+
+    def calcRanges(self) -> [SubnetRangeV4]:
+        '''calculate the subnets as one range of equally sized, back to back subnets per block size,
+        which can be expanded lazily into subnets'''
+        return self._placeRanges(self.blockCounts())
+
+    def calcFree(self) -> SubnetV4Array:
+        '''calculate the fewest aligned subnets covering the network addresses left free in the root network after subnetting'''
+        return self.SUBNET.exclude(self.root, self._calcPlan()[0])
+
+    def iterSubnets(self):
+        '''generate the same subnets as calcSubnets one at a time in constant extra memory,
+        raising an ImpossibleSubnetError before producing any if they cannot all fit'''
+        for block in self.calcRanges():
+            yield from block
+
+    def calcSubnets(self, compact: bool = False) -> [SubnetV4]:
         '''calculate the network addresses and subnet masks for creating sub networks
         from a root network address and subnet mask
-        and a list of host quantities for each sub network'''
-        hosts = self.hosts.copy()
-        hosts.sort()
-        hosts.reverse()
-        addr = self.root.networkAddr()
-        subnets = []
-        for host in hosts:
-            bit = SubnetterV4.requiredBits(host + 2)
-            mask = SubnetV4.MAX_BITS - bit
-            subnet = SubnetV4(addr, mask)
-            if subnet.broadcastAddr() > self.root.broadcastAddr():
-                raise ImpossibleSubnetError(self.root, self.hosts)
-            subnets.append(subnet)
-            addr += 2 ** bit
-        return subnets
+        and a list of host quantities for each sub network
+        (as a SubnetV4Array instead of a list if compact)'''
+        subnets = self._calcPlan()[0]
+        if compact:
+            return subnets[:]
+        return list(subnets)
 
     def requiredBits(x: int) -> int:
         '''claculate the number of bits required to store an unsigned integer'''
@@ -80,23 +257,140 @@ class SubnetterV4():
             raise ValueError('\'x\' must be greater than or equal to 0, not ' + str(x))
         elif x == 0:
             return 0
-        bits = 1
-        while x > 2 ** bits:
-            bits += 1
-        return bits
+        return max(1, (x - 1).bit_length())
 
     def calcRemaining(self) -> int:
         '''calculate the number of free network addresses in the root network after subnetting'''
-        subnets = self.calcSubnets()
-        used = 0
-        for subnet in subnets:
-            used += subnet.totalAddr()
-        return self.root.totalAddr() - used
-
-assert SubnetterV4() == SubnetterV4()
-assert SubnetterV4.requiredBits(0) == 0
-assert SubnetterV4.requiredBits(1) == 1
-assert SubnetterV4.requiredBits(2) == 1
-assert repr(SubnetterV4()) == 'SubnetterV4('+repr(SubnetV4())+',[1])'
-assert SubnetterV4(SubnetV4.strToSubnetV4('192.168.1.0/29'), [2,2]).calcSubnets() == [SubnetV4.strToSubnetV4('192.168.1.0/30'), SubnetV4.strToSubnetV4('192.168.1.4/30')]
-assert SubnetterV4(SubnetV4.strToSubnetV4('192.168.1.0/29'), [2,2]).calcRemaining() == 0
+        return self._calcPlan()[1]
+
+    def _planOne(root: SubnetV4, hosts: [int]):
+        '''calculate one plan, or the exception explaining why it cannot be done'''
+        try:
+            subnets, remaining = SubnetterV4(root, hosts)._calcPlan()
+        except (TypeError, ValueError, IndexError, ImpossibleSubnetError) as e:
+            return e
+        return (subnets[:], remaining)
+
+    def _planChunk(chunk: list) -> list:
+        '''calculate the plans for a chunk of compact (net_addr, mask, hosts) jobs in a worker process,
+        returning compact (net_addrs bytes, masks bytes, remaining) results or None for any that fail'''
+        res = []
+        for job in chunk:
+            try:
+                net_addr, mask, hosts = job
+                subnets, remaining = SubnetterV4(SubnetV4._unchecked(net_addr, mask), hosts)._calcPlan()
+            except (TypeError, ValueError, IndexError, ImpossibleSubnetError):
+                res.append(None)
+                continue
+            res.append((subnets.net_addrs.tobytes(), subnets.masks.tobytes(), remaining))
+        return res
+
+    def _unpackChunk(chunk: list, results: list):
+        '''rebuild the plans of a chunk from the compact results of a worker process'''
+        for (root, hosts), res in zip(chunk, results):
+            if res is None:
+                # recalculate failures here to raise the same exception as a serial run would
+                yield SubnetterV4._planOne(root, hosts)
+                continue
+            subnets = SubnetV4Array()
+            subnets.net_addrs.frombytes(res[0])
+            subnets.masks.frombytes(res[1])
+            yield (subnets, res[2])
+
+    def iterPlans(jobs, workers: int = 1, chunksize: int = None):
+        '''calculate the (SubnetV4Array, remaining) plan, or the exception explaining why it cannot be done,
+        for every (root, hosts) job in order, splitting the jobs in chunks across worker processes'''
+        if not isinstance(workers, int):
+            raise TypeError('\'workers\' must be an integer, not a ' + str(type(workers)))
+        if workers < 1:
+            raise ValueError('\'workers\' must be greater than 0, not ' + str(workers))
+        if chunksize is None:
+            chunksize = SubnetterV4.PLAN_CHUNK
+        jobs = iter(jobs)
+        chunk = list(islice(jobs, chunksize))
+        # a process pool only pays for itself once there is more than a chunk of work
+        if workers == 1 or len(chunk) < chunksize:
+            while chunk:
+                for root, hosts in chunk:
+                    yield SubnetterV4._planOne(root, hosts)
+                chunk = list(islice(jobs, chunksize))
+            return
+        # imported here as it is slow to import and only needed by the workers
+        from concurrent.futures import ProcessPoolExecutor
+        pending = deque()
+        with ProcessPoolExecutor(workers) as pool:
+            while chunk:
+                packed = [(root.net_addr, root.mask, hosts) if isinstance(root, SubnetV4) else None
+                          for root, hosts in chunk]
+                pending.append((chunk, pool.submit(SubnetterV4._planChunk, packed)))
+                # only keep a couple of chunks per worker in flight so memory stays bounded for streamed jobs
+                if len(pending) >= 2 * workers:
+                    done, future = pending.popleft()
+                    yield from SubnetterV4._unpackChunk(done, future.result())
+                chunk = list(islice(jobs, chunksize))
+            while pending:
+                done, future = pending.popleft()
+                yield from SubnetterV4._unpackChunk(done, future.result())
+
+    def planMany(jobs, workers: int = 1, chunksize: int = None) -> list:
+        '''calculate the (SubnetV4Array, remaining) plan, or the exception explaining why it cannot be done,
+        for every (root, hosts) job in order, using several worker processes for large batches'''
+        return list(SubnetterV4.iterPlans(jobs, workers, chunksize))
+
+class SubnetterV6(SubnetterV4):
+    '''a calculator for subnetting IPv6 networks, sharing the planning algorithm of SubnetterV4'''
+    SUBNET = SubnetV6
+    RANGE = SubnetRangeV6
+    # IPv6 plans are tuples of SubnetV6s, which take far more memory per subnet than a SubnetV4Array
+    CACHE = PlanCache(maxsubnets=2 ** 16)
+
+    def calcPlan(self) -> (tuple, int):
+        '''calculate the subnets and the number of remaining network addresses together'''
+        return self._calcPlan()
+
+    def _calcPlan(self) -> (tuple, int):
+        '''calculate the subnets and the number of remaining network addresses together,
+        sharing the result through the plan cache as an immutable tuple'''
+        counts = self.blockCounts()
+        key = (self.root, tuple(counts))
+        plan = self.CACHE.get(key)
+        if plan is not None:
+            return plan
+        ranges = self._placeRanges(counts)
+        subnets = tuple(subnet for block in ranges for subnet in block)
+        plan = (subnets, self.root.totalAddr() - sum(block.totalAddr() for block in ranges))
+        self.CACHE.put(key, plan)
+        return plan
+
+    def calcSubnets(self, compact: bool = False) -> [SubnetV6]:
+        '''calculate the network addresses and subnet masks for creating sub networks
+        from a root network address and subnet mask
+        and a list of host quantities for each sub network
+        (as a tuple instead of a list if compact, as IPv6 addresses do not fit in a packed array)'''
+        subnets = self._calcPlan()[0]
+        if compact:
+            return subnets
+        return list(subnets)
+
+    def _planOne(root: SubnetV6, hosts: [int]):
+        '''calculate one plan, or the exception explaining why it cannot be done'''
+        try:
+            return SubnetterV6(root, hosts)._calcPlan()
+        except (TypeError, ValueError, IndexError, ImpossibleSubnetError) as e:
+            return e
+
+    def iterPlans(jobs, workers: int = 1, chunksize: int = None):
+        '''calculate the (tuple, remaining) plan, or the exception explaining why it cannot be done,
+        for every (root, hosts) job in order; the jobs are always calculated in this process,
+        as the compact chunks sent to worker processes only hold 32 bit addresses'''
+        if not isinstance(workers, int):
+            raise TypeError('\'workers\' must be an integer, not a ' + str(type(workers)))
+        if workers < 1:
+            raise ValueError('\'workers\' must be greater than 0, not ' + str(workers))
+        for root, hosts in jobs:
+            yield SubnetterV6._planOne(root, hosts)
+
+    def planMany(jobs, workers: int = 1, chunksize: int = None) -> list:
+        '''calculate the (tuple, remaining) plan, or the exception explaining why it cannot be done,
+        for every (root, hosts) job in order'''
+        return list(SubnetterV6.iterPlans(jobs, workers, chunksize))
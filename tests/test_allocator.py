@@ -0,0 +1,93 @@
+import random
+
+import pytest
+
+from allocator import SubnetAllocatorV4
+from subnet import SubnetV4
+from subnetter import ImpossibleSubnetError, SubnetterV4
+
+SEED = 0
+
+def test_allocate_many_matches_plan():
+    root = SubnetV4.strToSubnetV4('10.0.0.0/24')
+    assert SubnetAllocatorV4(root).allocateMany([5,60,2]) == SubnetterV4(root, [5,60,2]).calcSubnets()
+
+def test_allocate():
+    assert SubnetAllocatorV4(SubnetV4.strToSubnetV4('10.0.0.0/24')).allocate(2) == SubnetV4.strToSubnetV4('10.0.0.0/30')
+
+def test_allocate_many_rolls_back():
+    allocator = SubnetAllocatorV4(SubnetV4.strToSubnetV4('10.0.0.0/28'))
+    with pytest.raises(ImpossibleSubnetError):
+        allocator.allocateMany([6, 6, 6])
+    assert allocator.calcSubnets() == []
+    assert allocator.calcRemaining() == 16
+
+def test_free_coalesces():
+    root = SubnetV4.strToSubnetV4('10.0.0.0/16')
+    allocator = SubnetAllocatorV4(root)
+    rand = random.Random(SEED)
+    subnets = []
+    for i in range(500):
+        if subnets and rand.random() < 0.4:
+            allocator.free(subnets.pop(rand.randrange(len(subnets))))
+        else:
+            subnets.append(allocator.allocate(rand.randint(1, 100)))
+        assert allocator.calcRemaining() == root.totalAddr() - sum(subnet.totalAddr() for subnet in subnets)
+    for subnet in subnets:
+        allocator.free(subnet)
+    assert allocator.free_blocks[root.mask] == {root.networkAddr()}
+
+def test_used_space():
+    root = SubnetV4.strToSubnetV4('10.0.0.0/24')
+    used = [SubnetV4.strToSubnetV4('10.0.0.0/26'), SubnetV4.strToSubnetV4('10.0.0.128/30')]
+    allocator = SubnetAllocatorV4(root, used)
+    assert allocator.calcFree() == SubnetV4.exclude(root, used)
+    assert allocator.calcRemaining() == 188
+    # every request goes into the smallest free block that fits it
+    assert allocator.allocateMany([60,10,2]) == [SubnetV4.strToSubnetV4('10.0.0.64/26'), SubnetV4.strToSubnetV4('10.0.0.144/28'),
+                                               SubnetV4.strToSubnetV4('10.0.0.132/30')]
+    assert allocator.calcFree() == SubnetV4.exclude(root, used + allocator.calcSubnets())
+
+def test_used_space_outside_root():
+    with pytest.raises(ValueError):
+        SubnetAllocatorV4(SubnetV4.strToSubnetV4('10.0.0.0/24'), [SubnetV4.strToSubnetV4('10.0.1.0/26')])
+
+def test_used_space_packing():
+    root = SubnetV4.strToSubnetV4('10.0.0.0/16')
+    rand = random.Random(SEED)
+    used = [SubnetV4(root.net_addr + (rand.getrandbits(16) & SubnetV4.ADDR_MASKS[mask]), mask)
+            for mask in [rand.randint(22, 30) for i in range(100)]]
+    free = SubnetV4.exclude(root, used)
+    for i in range(50):
+        allocator = SubnetAllocatorV4(root, used)
+        hosts = [rand.randint(1, 1000) for j in range(rand.randint(1, 40))]
+        # the requests fit exactly when placing them largest first into the free blocks in any order succeeds
+        sizes = sorted((SubnetV4.SIZES[SubnetV4.MAX_BITS - SubnetterV4.requiredBits(host + 2)] for host in hosts), reverse=True)
+        blocks = [subnet.totalAddr() for subnet in free]
+        feasible = True
+        for size in sizes:
+            fits = [block for block in blocks if block >= size]
+            if not fits:
+                feasible = False
+                break
+            block = min(fits)
+            blocks.remove(block)
+            while block > size:
+                block //= 2
+                blocks.append(block)
+        if not feasible:
+            with pytest.raises(ImpossibleSubnetError):
+                allocator.allocateMany(hosts)
+            assert allocator.calcFree() == free
+            continue
+        subnets = allocator.allocateMany(hosts)
+        assert SubnetV4.exclude(root, used + subnets) == allocator.calcFree()
+        assert sum(subnet.totalAddr() for subnet in SubnetV4.summarize(used)) + sum(subnet.totalAddr() for subnet in subnets) \
+            == root.totalAddr() - allocator.calcRemaining()
+
+def test_allocate_many_rolls_back_invalid_hosts():
+    allocator = SubnetAllocatorV4(SubnetV4.strToSubnetV4('10.0.0.0/24'))
+    with pytest.raises(ValueError):
+        allocator.allocateMany([60, 0])
+    assert allocator.calcSubnets() == []
+    assert allocator.calcRemaining() == 256
@@ -0,0 +1,78 @@
+import argparse
+import io
+import json
+import random
+
+import pytest
+
+from console import Console
+from serializer import JsonLinesSerializer
+from subnetter import SubnetterV4
+
+SEED = 0
+
+def batch(lines: [str], workers: int = 1) -> [dict]:
+    out = io.StringIO()
+    Console.batch(io.StringIO(''.join(line + '\n' for line in lines)), out, workers, JsonLinesSerializer)
+    return [json.loads(line) for line in out.getvalue().splitlines()]
+
+def mixedLines(n: int) -> [str]:
+    rand = random.Random(SEED)
+    lines = []
+    for i in range(n):
+        kind = rand.random()
+        if kind < 0.1:
+            lines.append('')
+        elif kind < 0.2:
+            lines.append(rand.choice(['bad', '10.0.0.0/24 x', '10.0.0.256/24 2', '10.0.0.0/24 0']))
+        elif kind < 0.3:
+            lines.append('10.0.0.0/30 ' + str(rand.randint(3, 100)))
+        else:
+            lines.append('10.0.0.0/16 ' + ' '.join(str(rand.randint(1, 200)) for j in range(rand.randint(1, 5))))
+    return lines
+
+def test_parse():
+    root, hosts = Console.parse('10.0.0.0/24 5 60')
+    assert (str(root), hosts) == ('10.0.0.0/24', [5, 60])
+
+def test_requests_skip_blank_lines():
+    requests = list(Console.requests(io.StringIO('10.0.0.0/24 2\n\n  \nbad\n')))
+    assert [line_no for line_no, args in requests] == [1, 4]
+    assert isinstance(requests[1][1], ValueError)
+
+def test_batch_errors():
+    records = batch(['10.0.0.0/24 60 2', '', 'bad', '10.0.0.0/30 100', '10.0.0.0/24 0'])
+    assert [record['line'] for record in records] == [1, 1, 1, 3, 4, 5]
+    assert records[2] == {'line': 1, 'remaining': 188}
+    assert records[3]['error'].startswith('Invalid network address or slash notation mask')
+    assert records[4]['error'].startswith('Impossible subnetting request')
+    assert records[5]['error'].startswith('Invalid input')
+
+def test_batch_matches_plans():
+    lines = mixedLines(300)
+    records = batch(lines)
+    for line_no, line in enumerate(lines, 1):
+        plan = [record for record in records if record['line'] == line_no]
+        if line == '':
+            assert plan == []
+            continue
+        try:
+            subnetter = SubnetterV4(*Console.parse(line))
+            subnets = [str(subnet) for subnet in subnetter.calcSubnets()]
+            remaining = subnetter.calcRemaining()
+        except Exception:
+            assert len(plan) == 1 and 'error' in plan[0]
+            continue
+        assert [record['subnet'] for record in plan[:-1]] == subnets
+        assert plan[-1] == {'line': line_no, 'remaining': remaining}
+
+def test_batch_workers_keep_lines_aligned():
+    # enough requests for several chunks across the worker processes
+    lines = mixedLines(3 * SubnetterV4.PLAN_CHUNK)
+    assert batch(lines, 2) == batch(lines)
+
+def test_positive_int():
+    assert Console.positiveInt('4') == 4
+    for value in ('0', '-1', 'x'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            Console.positiveInt(value)
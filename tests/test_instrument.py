@@ -0,0 +1,48 @@
+import io
+
+from console import Console
+from instrument import CountingStream, Instrumentation
+from serializer import JsonLinesSerializer, TextSerializer
+
+def test_counting_stream_counts_encoded_bytes():
+    stats = Instrumentation()
+    out = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+    stream = CountingStream(out, stats)
+    stream.write('café\n')
+    out.flush()
+    assert stats.counters['bytes written'] == len(out.buffer.getvalue()) == 6
+    CountingStream(io.BytesIO(), stats).write(b'\x00\x01')
+    assert stats.counters['bytes written'] == 8
+
+LINES = ['10.0.0.0/24 60 2', '', 'bad', '10.0.0.0/30 100']
+
+def test_batch_stats():
+    stats = Instrumentation()
+    stats.install(Console)
+    out = io.StringIO()
+    try:
+        Console.batch(io.StringIO(''.join(line + '\n' for line in LINES)), out, 1, TextSerializer)
+    finally:
+        stats.uninstall()
+    # one line that cannot be parsed and one that cannot be calculated
+    assert stats.counters == {'requests': 3, 'subnets': 2, 'errors': 2, 'bytes written': len(out.getvalue().encode())}
+    assert stats.calls['parse'] == 3
+    # every wrapped function is restored
+    assert Console.batch.__qualname__ == 'Console.batch'
+    assert JsonLinesSerializer.writePlan.__qualname__ == 'JsonLinesSerializer.writePlan'
+
+def test_interactive_stats_match_batch():
+    stats = Instrumentation()
+    stats.install(Console)
+    try:
+        for line in LINES:
+            if line != '':
+                args = Console.interpret(line)
+                if args != None:
+                    res = Console.calculate(args)
+                    if res != None:
+                        Console.display(res)
+    finally:
+        stats.uninstall()
+    assert (stats.counters['requests'], stats.counters['subnets'], stats.counters['errors']) == (3, 2, 2)
+    assert stats.calls['parse'] == stats.calls['plan'] + 1 == 3
@@ -0,0 +1,66 @@
+import csv
+import io
+import json
+
+import pytest
+
+from serializer import SERIALIZERS, BinarySerializer, CsvSerializer, JsonLinesSerializer, TextSerializer
+from subnet import SubnetV4
+from subnetter import SubnetterV4
+
+ROOT = SubnetV4.strToSubnetV4('10.0.0.0/24')
+
+def plans() -> list:
+    subnetter = SubnetterV4(ROOT, [60, 5, 2])
+    return [(subnetter.calcSubnets(True), subnetter.calcRemaining()), (subnetter.calcSubnets(), subnetter.calcRemaining())]
+
+def write(serializer, results) -> io.IOBase:
+    out = io.BytesIO() if serializer.BINARY else io.StringIO()
+    writer = serializer(out)
+    writer.writePlan(results, 1)
+    writer.writeError('Impossible subnetting request: café', 2)
+    writer.close()
+    return out
+
+@pytest.mark.parametrize('results', plans())
+def test_text(results):
+    lines = write(TextSerializer, results).getvalue().split('\n')
+    assert lines == ['10.0.0.0/26 with 62 usable network addresses.', '10.0.0.64/29 with 6 usable network addresses.',
+                     '10.0.0.72/30 with 2 usable network addresses.', 'With 180 network addresses remaining.', '',
+                     'Error on line 2: Impossible subnetting request: café', '', '']
+
+@pytest.mark.parametrize('results', plans())
+def test_json_lines_round_trip(results):
+    records = [json.loads(line) for line in write(JsonLinesSerializer, results).getvalue().splitlines()]
+    assert [SubnetV4.strToSubnetV4(record['subnet']) for record in records if 'subnet' in record] == list(results[0])
+    assert [record['usable'] for record in records if 'usable' in record] == [subnet.useableAddr() for subnet in results[0]]
+    assert records[-2] == {'line': 1, 'remaining': results[1]}
+    assert records[-1] == {'line': 2, 'error': 'Impossible subnetting request: café'}
+
+@pytest.mark.parametrize('results', plans())
+def test_csv_round_trip(results):
+    rows = list(csv.DictReader(io.StringIO(write(CsvSerializer, results).getvalue())))
+    assert tuple(rows[0]) == CsvSerializer.HEADER
+    assert [SubnetV4.strToSubnetV4(row['subnet']) for row in rows if row['subnet']] == list(results[0])
+    assert [int(row['usable']) for row in rows if row['usable']] == [subnet.useableAddr() for subnet in results[0]]
+    assert rows[-2] == {'line': '1', 'subnet': '', 'usable': '', 'remaining': str(results[1]), 'error': ''}
+    assert rows[-1] == {'line': '2', 'subnet': '', 'usable': '', 'remaining': '', 'error': 'Impossible subnetting request: café'}
+
+@pytest.mark.parametrize('results', plans())
+def test_binary_round_trip(results):
+    buffer = write(BinarySerializer, results).getvalue()
+    assert len(buffer) == BinarySerializer.RECORD.size * (len(results[0]) + 2)
+    plan, error = BinarySerializer.readPlans(buffer)
+    assert plan == (results[0], results[1])
+    assert error == 2
+
+def test_registry():
+    assert SERIALIZERS == {'text': TextSerializer, 'jsonl': JsonLinesSerializer, 'csv': CsvSerializer, 'binary': BinarySerializer}
+
+def test_chunked_round_trip():
+    # more subnets than a chunk of formatMany
+    subnetter = SubnetterV4(SubnetV4.strToSubnetV4('10.0.0.0/16'), [2] * 5000)
+    results = (subnetter.calcSubnets(True), subnetter.calcRemaining())
+    records = [json.loads(line) for line in write(JsonLinesSerializer, results).getvalue().splitlines()]
+    assert [SubnetV4.strToSubnetV4(record['subnet']) for record in records if 'subnet' in record] == list(results[0])
+    assert next(BinarySerializer.readPlans(write(BinarySerializer, results).getvalue())) == results
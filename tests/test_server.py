@@ -0,0 +1,78 @@
+import asyncio
+
+from server import PlanServer
+from subnet import SubnetV4
+
+ROOT = SubnetV4.strToSubnetV4('10.0.0.0/8')
+LARGE = [2] * PlanServer.LARGE_PLAN
+
+async def started() -> PlanServer:
+    server = PlanServer(port=0, workers=1)
+    await server.start()
+    return server
+
+async def request(server: PlanServer, lines: [bytes]) -> [bytes]:
+    reader, writer = await asyncio.open_connection(server.host, server.server.sockets[0].getsockname()[1])
+    writer.write(b''.join(lines))
+    writer.write_eof()
+    res = [line async for line in reader]
+    writer.close()
+    await writer.wait_closed()
+    return res
+
+def test_requests():
+    async def run():
+        server = await started()
+        try:
+            return await request(server, [b'10.0.0.0/24 5 60 2\n', b'\n', b'bad\n', b'10.0.0.0/30 100\n'])
+        finally:
+            await server.stop()
+    res = asyncio.run(run())
+    assert res[0] == b'{"subnets": ["10.0.0.0/26", "10.0.0.64/29", "10.0.0.72/30"], "remaining": 180}\n'
+    assert res[1].startswith(b'{"error": "Invalid network address')
+    assert res[2].startswith(b'{"error": "Impossible subnetting request')
+    assert len(res) == 3
+
+def test_limits():
+    async def run():
+        server = await started()
+        try:
+            hosts = await request(server, [b'10.0.0.0/8' + b' 1' * (PlanServer.MAX_HOSTS + 1) + b'\n', b'10.0.0.0/24 2\n'])
+            line = await request(server, [b'1' * (PlanServer.MAX_LINE + 1) + b'\n', b'10.0.0.0/24 2\n'])
+            return hosts, line
+        finally:
+            await server.stop()
+    hosts, line = asyncio.run(run())
+    assert hosts[0].startswith(b'{"error": "Requests must have at most')
+    assert hosts[1].startswith(b'{"subnets"')
+    # the connection is closed after a line that is too long
+    assert len(line) == 1 and line[0].startswith(b'{"error": "Request lines must be at most')
+
+def test_coalescing():
+    async def run():
+        server = await started()
+        try:
+            res = await asyncio.gather(server.plan(ROOT, LARGE), server.plan(ROOT, LARGE[::-1]))
+            return res, server.coalesced, server.in_flight
+        finally:
+            await server.stop()
+    res, coalesced, in_flight = asyncio.run(run())
+    assert coalesced == 1
+    assert res[0] == res[1] == PlanServer.respond(ROOT, LARGE)
+    assert not in_flight
+
+def test_cancelled_calculation_releases_coalesced_requests():
+    async def run():
+        server = await started()
+        try:
+            owner = asyncio.create_task(server.plan(ROOT, LARGE))
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(server.plan(ROOT, LARGE))
+            await asyncio.sleep(0)
+            owner.cancel()
+            return await asyncio.wait_for(waiter, 10), server.in_flight
+        finally:
+            await server.stop()
+    res, in_flight = asyncio.run(run())
+    assert res.startswith('{"error": "Failed to calculate')
+    assert not in_flight
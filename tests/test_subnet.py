@@ -0,0 +1,160 @@
+import random
+from array import array
+
+import pytest
+
+from subnet import (ADDR_TYPECODE, COUNT_TYPECODE, MASK_TYPECODE, AddrPartTooBigError, AddrSepCountError, AddrTooBigError,
+                    AddrTooSmallError, MaskSepCountError, MaskTooBigError, MaskTooSmallError, SubnetRangeV4, SubnetRangeV6,
+                    SubnetV4, SubnetV4Array, SubnetV6)
+
+SEED = 0
+ROUNDS = 10000
+
+def randomSubnetV4s(n: int, seed: int = SEED) -> [SubnetV4]:
+    rand = random.Random(seed)
+    return [SubnetV4(rand.getrandbits(SubnetV4.MAX_BITS), rand.randint(0, SubnetV4.MAX_BITS)) for i in range(n)]
+
+def test_equality():
+    assert SubnetV4() == SubnetV4()
+    assert SubnetV4(255,24) != SubnetV4(255,25)
+
+def test_repr():
+    assert repr(SubnetV4(255,24)) == 'SubnetV4(255,24)'
+
+def test_conversions():
+    assert SubnetV4.strToAddr('255.255.255.255') == (255,255,255,255)
+    assert SubnetV4.addrToInt((255,255,255,0)) == 0xffffff00
+    assert SubnetV4.intToAddr(0xffffff00) == (255,255,255,0)
+    assert SubnetV4.strToSubnetV4('255.255.255.0/24') == SubnetV4(0xffffff00,24)
+    assert str(SubnetV4(255,24)) == '0.0.0.255/24'
+
+def test_addresses():
+    subnet = SubnetV4(0xffffff00,24)
+    assert subnet.totalAddr() == 2 ** (SubnetV4.MAX_BITS - 24)
+    assert subnet.useableAddr() == 2 ** (SubnetV4.MAX_BITS - 24) - 2
+    assert subnet.broadcastAddr() == 0xffffffff
+    assert subnet.networkAddr() == 0xffffff00
+    assert subnet.firstAddr() == 0xffffff01
+    assert subnet.lastAddr() == 0xfffffffe
+    assert SubnetV4.strToSubnetV4('123.244.0.1/16').slashMask() == 16
+    assert SubnetV4.strToSubnetV4('123.244.0.1/16').addrMask() == (255,255,0,0)
+
+@pytest.mark.parametrize('string, error', [
+    ('10.0.0.0', MaskSepCountError),
+    ('10.0.0.0/33', MaskTooBigError),
+    ('10.0.0/8', AddrSepCountError),
+    ('10.0.0.256/8', AddrPartTooBigError),
+])
+def test_invalid_strings(string: str, error: type):
+    with pytest.raises(error):
+        SubnetV4.strToSubnetV4(string)
+
+def test_int_round_trip():
+    rand = random.Random(SEED)
+    for i in range(ROUNDS):
+        x = rand.getrandbits(SubnetV4.MAX_BITS)
+        addr = SubnetV4.intToAddr(x)
+        assert len(addr) == SubnetV4.ADDR_DIVISIONS
+        assert SubnetV4.addrToInt(addr) == x
+
+def test_addr_round_trip():
+    rand = random.Random(SEED)
+    for i in range(ROUNDS):
+        addr = tuple(rand.randint(0, 255) for part in range(SubnetV4.ADDR_DIVISIONS))
+        assert SubnetV4.intToAddr(SubnetV4.addrToInt(addr)) == addr
+        assert SubnetV4.strToAddr('.'.join(map(str, addr))) == addr
+
+def test_str_round_trip():
+    for subnet in randomSubnetV4s(ROUNDS):
+        string = str(subnet)
+        assert SubnetV4.strToSubnetV4(string) == subnet
+        assert string == '.'.join(map(str, SubnetV4.intToAddr(subnet.net_addr))) + '/' + str(subnet.mask)
+
+def test_many_round_trip():
+    strs = list(map(str, randomSubnetV4s(ROUNDS)))
+    net_addrs, masks, errors = SubnetV4.parseMany(strs)
+    assert not errors
+    assert SubnetV4.formatMany(net_addrs, masks) == strs
+
+def test_parse_many_errors():
+    net_addrs, masks, errors = SubnetV4.parseMany(['10.0.0.0/8', '10.0.0.256/8', '10.0.0.0/33', '10.0.0/8'])
+    assert (net_addrs, masks) == (array(ADDR_TYPECODE, [10 << 24, 0, 0, 0]), array(MASK_TYPECODE, [8, 0, 0, 0]))
+    assert sorted(errors) == [1, 2, 3]
+
+def test_parse_many_keeps_rows_aligned():
+    strs = ['bad', '10.0.0.0/8', None, '192.168.1.0/24']
+    net_addrs, masks, errors = SubnetV4.parseMany(strs)
+    assert len(net_addrs) == len(masks) == len(strs)
+    assert sorted(errors) == [0, 2]
+    for row in (1, 3):
+        assert SubnetV4(net_addrs[row], masks[row]) == SubnetV4.strToSubnetV4(strs[row])
+
+def test_format_many():
+    assert SubnetV4.formatMany(array(ADDR_TYPECODE, [255]), array(MASK_TYPECODE, [24])) == [str(SubnetV4(255,24))]
+
+def test_array():
+    assert SubnetV4Array([255],[24])[0] == SubnetV4(255,24)
+    assert SubnetV4Array([255],[24]).broadcastAddr() == array(COUNT_TYPECODE, [SubnetV4(255,24).broadcastAddr()])
+    assert SubnetV4Array([0],[0]).totalAddr() == array(COUNT_TYPECODE, [SubnetV4(0,0).totalAddr()])
+    assert SubnetV4Array([0],[16]).addrMask() == array(ADDR_TYPECODE, [SubnetV4.addrToInt(SubnetV4(0,16).addrMask())])
+
+@pytest.mark.parametrize('net_addrs, masks, error', [
+    ([1], [-1], MaskTooSmallError),
+    ([-1], [1], AddrTooSmallError),
+    ([2 ** 32], [1], AddrTooBigError),
+    ([1], [256], MaskTooBigError),
+])
+def test_invalid_array(net_addrs: [int], masks: [int], error: type):
+    with pytest.raises(error):
+        SubnetV4Array(net_addrs, masks)
+
+def test_array_matches_subnets():
+    subnets = randomSubnetV4s(1000)
+    subnets_array = SubnetV4Array.fromSubnets(subnets)
+    assert list(subnets_array) == subnets
+    assert list(subnets_array.useableAddr()) == [subnet.useableAddr() for subnet in subnets]
+    # the random network addresses have host bits set, so some broadcast addresses are past the 32 bit limit
+    assert list(subnets_array.broadcastAddr()) == [subnet.broadcastAddr() for subnet in subnets]
+
+def test_range():
+    assert list(SubnetRangeV4(0,30,2)) == [SubnetV4(0,30), SubnetV4(4,30)] == SubnetRangeV4(0,30,2).toArray()
+
+def test_summarize():
+    subnets = [SubnetV4.strToSubnetV4('10.0.0.0/25'), SubnetV4.strToSubnetV4('10.0.0.128/25'), SubnetV4.strToSubnetV4('10.0.1.0/30')]
+    assert SubnetV4.summarize(subnets) == [SubnetV4.strToSubnetV4('10.0.0.0/24'), SubnetV4.strToSubnetV4('10.0.1.0/30')]
+
+def test_exclude():
+    root = SubnetV4.strToSubnetV4('10.0.0.0/24')
+    assert SubnetV4.exclude(root, [SubnetV4.strToSubnetV4('10.0.0.0/25')]) == [SubnetV4.strToSubnetV4('10.0.0.128/25')]
+
+def test_v6_conversions():
+    assert SubnetV6.strToSubnetV6('2001:db8::/32') == SubnetV6(0x20010db8 << 96, 32)
+    assert str(SubnetV6(0x20010db8 << 96 | 1, 64)) == '2001:db8::1/64'
+    assert SubnetV6.strToAddr('1:0:0:2::3') == (1,0,0,2,0,0,0,3)
+    assert SubnetV6.addrToStr(SubnetV6.addrToInt((1,0,0,2,0,0,0,3))) == '1:0:0:2::3'
+    assert SubnetV6(0,64).addrMask() == (0xffff,0xffff,0xffff,0xffff,0,0,0,0)
+
+@pytest.mark.parametrize('string, error', [
+    ('0x1:+2:3_0:00004::/64', ValueError),
+    ('1:2:3:00004::/64', ValueError),
+    ('1: 2::/64', ValueError),
+    ('1:-2::/64', ValueError),
+    ('1:g::/64', ValueError),
+    ('1:2:3:4:5:6:7:/64', ValueError),
+    ('1:12345::/64', AddrPartTooBigError),
+])
+def test_v6_invalid_strings(string: str, error: type):
+    with pytest.raises(error):
+        SubnetV6.strToSubnetV6(string)
+
+def test_v6_str_round_trip():
+    rand = random.Random(SEED)
+    for i in range(ROUNDS):
+        # runs of zero parts so the :: compression is exercised
+        addr = tuple(rand.choice((0, rand.getrandbits(16))) for part in range(SubnetV6.ADDR_DIVISIONS))
+        subnet = SubnetV6(SubnetV6.addrToInt(addr), rand.randint(0, SubnetV6.MAX_BITS))
+        assert SubnetV6.intToAddr(subnet.net_addr) == addr
+        assert SubnetV6.strToSubnetV6(str(subnet)) == subnet
+
+def test_v6_range():
+    assert list(SubnetRangeV6(0,127,2)) == [SubnetV6(0,127), SubnetV6(2,127)]
@@ -0,0 +1,42 @@
+import random
+from array import array
+
+import pytest
+
+from subnet import COUNT_TYPECODE, SubnetV4
+from subnetindex import SubnetIndexV4
+
+SEED = 0
+
+def test_lookup():
+    index = SubnetIndexV4([SubnetV4.strToSubnetV4('10.0.0.0/8'), SubnetV4.strToSubnetV4('10.1.0.0/16')])
+    assert index.lookup(SubnetV4.addrToInt((10,1,2,3))) == SubnetV4.strToSubnetV4('10.1.0.0/16')
+    assert index.lookup(SubnetV4.addrToInt((11,0,0,0))) is None
+
+def test_lookup_many():
+    index = SubnetIndexV4([SubnetV4.strToSubnetV4('10.0.0.0/8')])
+    assert index.lookupMany([SubnetV4.addrToInt((10,1,2,3)), 0]) == array(COUNT_TYPECODE, [0, -1])
+
+def test_lookup_many_out_of_range():
+    index = SubnetIndexV4([SubnetV4.strToSubnetV4('10.0.0.0/8')])
+    with pytest.raises(ValueError):
+        index.lookupMany([0, SubnetV4.ADDR_LIMIT])
+    with pytest.raises(ValueError):
+        index.lookupMany([-1, 0])
+
+def test_overlaps():
+    assert SubnetIndexV4([SubnetV4.strToSubnetV4('10.1.0.0/16')]).overlaps([SubnetV4.strToSubnetV4('10.0.0.0/8')])
+
+def test_lookup_matches_brute_force():
+    rand = random.Random(SEED)
+    masks = [rand.randint(4, 28) for i in range(300)]
+    subnets = [SubnetV4(rand.getrandbits(SubnetV4.MAX_BITS) & 0x0fffffff & SubnetV4.ADDR_MASKS[mask], mask) for mask in masks]
+    index = SubnetIndexV4(subnets)
+    addrs = [rand.getrandbits(SubnetV4.MAX_BITS) & 0x0fffffff for i in range(2000)]
+    for addr, found in zip(addrs, index.lookupMany(addrs)):
+        matches = [subnet for subnet in subnets if subnet.networkAddr() <= addr <= subnet.broadcastAddr()]
+        if matches:
+            assert subnets[found].mask == max(subnet.mask for subnet in matches)
+        else:
+            assert found == -1
+        assert index.lookupIndex(addr) == found
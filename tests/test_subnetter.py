@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from subnet import SubnetRangeV4, SubnetV4, SubnetV6
+from subnetter import ImpossibleSubnetError, PlanCache, SubnetterV4, SubnetterV6
+
+SEED = 0
+
+def subnet(string: str) -> SubnetV4:
+    return SubnetV4.strToSubnetV4(string)
+
+def test_defaults():
+    assert SubnetterV4() == SubnetterV4()
+    assert repr(SubnetterV4()) == 'SubnetterV4('+repr(SubnetV4())+',[1])'
+    assert SubnetterV6().root == SubnetV6()
+
+def test_required_bits():
+    assert SubnetterV4.requiredBits(0) == 0
+    assert SubnetterV4.requiredBits(1) == 1
+    assert SubnetterV4.requiredBits(2) == 1
+
+def test_calc_subnets():
+    subnetter = SubnetterV4(subnet('192.168.1.0/29'), [2,2])
+    assert subnetter.calcSubnets() == [subnet('192.168.1.0/30'), subnet('192.168.1.4/30')]
+    assert subnetter.calcSubnets(True) == subnetter.calcSubnets()
+    assert subnetter.calcRemaining() == 0
+    assert SubnetterV4(subnet('192.168.1.0/24'), [2,2]).calcRemaining() == 248
+
+def test_impossible():
+    subnetter = SubnetterV4(subnet('192.168.1.0/30'), [2,2])
+    assert not subnetter.isFeasible()
+    with pytest.raises(ImpossibleSubnetError):
+        subnetter.calcSubnets()
+
+def test_plans_do_not_overlap():
+    rand = random.Random(SEED)
+    for i in range(200):
+        root = SubnetV4(rand.getrandbits(SubnetV4.MAX_BITS) & SubnetV4.ADDR_MASKS[16], 16)
+        subnetter = SubnetterV4(root, [rand.randint(1, 2000) for j in range(rand.randint(1, 30))])
+        if not subnetter.isFeasible():
+            continue
+        subnets = subnetter.calcSubnets()
+        assert sorted(subnet.useableAddr() for subnet in subnets) >= sorted(subnetter.hosts)
+        end = root.networkAddr()
+        for subnet_ in sorted(subnets, key=lambda x: x.net_addr):
+            assert subnet_.net_addr >= end
+            end = subnet_.net_addr + subnet_.totalAddr()
+        assert end <= root.networkAddr() + root.totalAddr()
+        assert subnetter.calcRemaining() == root.totalAddr() - sum(subnet_.totalAddr() for subnet_ in subnets)
+
+def test_counted_hosts():
+    root = subnet('192.168.1.0/24')
+    assert SubnetterV4(root, {2: 3, 60: 1}).calcSubnets() == SubnetterV4(root, [2,60,2,2]).calcSubnets()
+    assert SubnetterV4(root, [(2, 3)]).calcRanges() == [SubnetRangeV4(SubnetV4.addrToInt((192,168,1,0)), 30, 3)]
+
+def test_iter_subnets():
+    subnetter = SubnetterV4(subnet('192.168.1.0/24'), [2,60,5])
+    assert list(subnetter.iterSubnets()) == subnetter.calcSubnets()
+
+def test_plan_many():
+    assert SubnetterV4.planMany([(subnet('192.168.1.0/29'), [2,2])])[0][1] == 0
+
+def test_plan_many_workers():
+    rand = random.Random(SEED)
+    jobs = [(subnet('10.0.0.0/16'), [rand.randint(1, 500) for j in range(10)]) for i in range(100)]
+    plans = SubnetterV4.planMany(jobs)
+    assert SubnetterV4.planMany(jobs, 2, 16) == plans
+    assert plans[0] == (SubnetterV4(*jobs[0]).calcSubnets(True), SubnetterV4(*jobs[0]).calcRemaining())
+
+def test_plan_cache():
+    cache = PlanCache(1)
+    cache.put('a', ([1], 0))
+    cache.put('b', ([2], 0))
+    assert cache.get('a') is None
+    assert cache.get('b') == ([2], 0)
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 1, 1)
+
+def test_plan_cache_subnet_limit():
+    cache = PlanCache(maxsubnets=3)
+    cache.put('a', ([1, 2], 0))
+    cache.put('b', ([3], 0))
+    cache.put('c', ([4, 5], 0))
+    assert cache.get('a') is None
+    assert cache.get('b') == ([3], 0)
+    assert cache.subnets == 3
+    cache.put('d', ([6, 7, 8, 9], 0))
+    assert cache.get('d') is None
+    assert len(cache) == 2
+
+def test_plan_is_not_shared():
+    root = subnet('192.168.1.0/24')
+    SubnetterV4(root, [2]).calcPlan()[0].net_addrs[0] = 99
+    SubnetterV4(root, [2]).calcSubnets(True).masks[0] = 1
+    assert SubnetterV4(root, [2]).calcSubnets() == [subnet('192.168.1.0/30')]
+
+def test_v6():
+    subnetter = SubnetterV6(SubnetV6.strToSubnetV6('2001:db8::/120'), [2,60,5])
+    assert subnetter.calcSubnets() == [SubnetV6.strToSubnetV6('2001:db8::/122'), SubnetV6.strToSubnetV6('2001:db8::40/125'),
+                                       SubnetV6.strToSubnetV6('2001:db8::48/126')]
+    assert subnetter.calcRemaining() == 180
+
+def test_v6_compact():
+    subnetter = SubnetterV6(SubnetV6.strToSubnetV6('2001:db8::/120'), [2,60,5])
+    assert list(subnetter.calcSubnets(True)) == subnetter.calcSubnets()
+
+def test_v6_plan_many():
+    root = SubnetV6.strToSubnetV6('2001:db8::/120')
+    plans = SubnetterV6.planMany([(root, [2,60,5]), (root, [1000])], 2)
+    assert plans[0] == SubnetterV6(root, [2,60,5]).calcPlan()
+    assert isinstance(plans[1], ImpossibleSubnetError)